@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
-from pathlib import Path
+import hashlib
+import importlib.util
 import re
-import tempfile
-from data_cleaner import run_cleaning_pipeline, run_cleaning_pipeline2   
+import uuid
+from data_cleaner import (
+    run_cleaning_pipeline, run_cleaning_pipeline2, CleanCache, split_name_series, normalize_date_series,
+    export_frame, EXPORT_FORMATS, ColumnResolver
+)
+from upload_store import UploadStore
+from master_store import MasterStore, SESSION_PREFIX, expire_sessions
 
 st.markdown(
     """
@@ -112,7 +118,7 @@ AUTO_ALIASES = {
     "Name" : ["name of the teacher", "name of teacher", "name of participant","name of the participant", "participant name", "teacher name", "name"],
     "Mobile Number": ["mobile", "phone", "phone number", "phone no", "contact","contact number", "mobile/contact number"],
     "Email": ["email", "email id", "email address"],
-    "Institute Name": ["name of school", "name of the school", "school","school/college", "college", "institution" "institution"],
+    "Institute Name": ["name of school", "name of the school", "school","school/college", "college", "institution"],
     "Board": ["board", "medium"],
     "City": ["city", "district","city/district"],
     "State": ["state"],
@@ -122,6 +128,33 @@ AUTO_ALIASES = {
 SOURCE_OPTIONS = ["Event", "Sales Team", "Retailer", "Website", "Form", "Other"]
 STAKEHOLDER_OPTIONS = ["Teacher", "School", "Student", "Retailer", "Other"]
 
+# duplicate keys / survivorship for the final dataset (cleaned column names)
+DEDUP_KEY_OPTIONS = {
+    "Whole row": None,
+    "Mobile Number": ["Phone Number"],
+    "Email": ["Email ID"],
+    "Mobile Number + Email": ["Phone Number", "Email ID"],
+}
+DEDUP_POLICY_OPTIONS = {
+    "Keep last": "last",
+    "Keep first": "first",
+    "Keep latest date": "latest",
+    "Keep most complete": "most_complete",
+}
+
+EXPORT_OPTIONS = {"CSV": "csv", "CSV (gzip)": "csv.gz"}
+# pyarrow is optional (not in requirements.txt): offer Parquet only when installed
+if importlib.util.find_spec("pyarrow") is not None:
+    EXPORT_OPTIONS["Parquet"] = "parquet"
+
+# Cleaned results kept in memory, keyed by uploaded file content
+RESULT_CACHE_ENTRIES = 4
+RESULT_CACHE_TTL = 60 * 60  # seconds
+
+# Open master stores (one SQLite connection each); idle ones are released
+MASTER_CACHE_ENTRIES = 16
+MASTER_CACHE_TTL = 60 * 60  # seconds
+
 # --------------------------------------------------
 # FILE UPLOAD
 # --------------------------------------------------
@@ -135,22 +168,51 @@ if not uploaded_files:
     st.stop()
 
 # --------------------------------------------------
-# SAVE FILES TEMPORARILY
+# UPLOAD SIGNATURE (name + content hash)
+# --------------------------------------------------
+def file_digest(f):
+    # hashed once per upload, widget reruns reuse the stored digest
+    digests = st.session_state.setdefault("upload_digests", {})
+    key = (getattr(f, "file_id", None) or f.name, f.size)
+
+    if key not in digests:
+        digests[key] = hashlib.sha256(f.getbuffer()).hexdigest()
+    return digests[key]
+
+
+upload_signature = tuple((f.name, file_digest(f)) for f in uploaded_files)
+
+# --------------------------------------------------
+# SAVE FILES (each distinct file once, shared across sessions)
 # --------------------------------------------------
-temp_dir = Path(tempfile.mkdtemp())
-input_paths = []
+@st.cache_resource
+def get_upload_store():
+    return UploadStore()
+
 
-for f in uploaded_files:
-    path = temp_dir / f.name
-    with open(path, "wb") as fp:
-        fp.write(f.getbuffer())
-    input_paths.append(path)
+upload_store = get_upload_store()
+upload_digests = [digest for _, digest in upload_signature]
 
 # --------------------------------------------------
 # RUN EXISTING CLEANING PIPELINE
 # --------------------------------------------------
+if "clean_cache" not in st.session_state:
+    st.session_state["clean_cache"] = CleanCache()
+clean_cache = st.session_state["clean_cache"]
+
+
+@st.cache_data(max_entries=RESULT_CACHE_ENTRIES, ttl=RESULT_CACHE_TTL, show_spinner=False)
+def clean_uploads(signature, _uploaded_files, _clean_cache):
+    # Only `signature` is hashed: the same uploads (any widget rerun)
+    # return the stored frame instead of re-reading and re-cleaning
+    input_paths = upload_store.put_uploads(_uploaded_files, upload_digests)
+    upload_store.evict(keep=upload_digests)
+
+    return run_cleaning_pipeline(input_paths, cache=_clean_cache)
+
+
 with st.spinner("Running cleaning pipeline..."):
-    cleaned_df = run_cleaning_pipeline(input_paths)
+    cleaned_df = clean_uploads(upload_signature, uploaded_files, clean_cache)
 
 st.success("Cleaning completed")
 
@@ -165,6 +227,15 @@ st.subheader("🧩 Column Mapping")
 final_df = pd.DataFrame()
 available_cols = ["<No Column>"] + list(cleaned_df.columns)
 
+
+@st.cache_resource
+def get_column_resolver():
+    # compiled once; suggestions are cached per header across reruns
+    return ColumnResolver(AUTO_ALIASES)
+
+
+auto_matches = get_column_resolver().resolve(cleaned_df.columns)
+
 mapping = {}
 
 for field in REQUIRED_FIELDS:
@@ -180,12 +251,7 @@ for field in REQUIRED_FIELDS:
 
     st.markdown(f"**{field}**")
 
-    auto_match = None
-    for col in cleaned_df.columns:
-        for a in AUTO_ALIASES.get(field, []):
-            if a in col.lower():
-                auto_match = col
-                break
+    auto_match = auto_matches.get(field)
 
     if field in ["Source of Data", "Stakeholder Category"]:
         col1, col2 = st.columns(2)
@@ -220,108 +286,6 @@ for field in REQUIRED_FIELDS:
         )
 
 
-def split_name(name):
-    if pd.isna(name) or str(name).strip() == "":
-        return "", ""
-
-    s = str(name).strip()
-
-    # ----------------------------------
-    # 0. Add space after every dot
-    # ----------------------------------
-    s = re.sub(r"\.(?=\S)", ". ", s)
-
-    # ----------------------------------
-    # 1. Remove common titles / honorifics
-    # ----------------------------------
-    s = re.sub(
-        r"^(mr|mrs|mister|miss|misses|ms|sir|mam|madam|dr)\.?\s+",
-        "",
-        s,
-        flags=re.IGNORECASE
-    )
-
-    # ----------------------------------
-    # 2. Normalize spaces
-    # ----------------------------------
-    s = re.sub(r"\s+", " ", s).strip()
-
-    parts = s.split()
-    if not parts:
-        return "", ""
-
-    # ----------------------------------
-    # 3. Single word name
-    # ----------------------------------
-    if len(parts) == 1:
-        first = re.sub(r"^[^A-Za-z]+|[^A-Za-z]+$", "", parts[0])
-        return first, ""
-
-    # ----------------------------------
-    # 4. First & Last name cleanup
-    # ----------------------------------
-    first = parts[0]
-    last = parts[-1]
-
-    # Remove trailing dot from initials (e.g., G.)
-    last = re.sub(r"\.$", "", last)
-
-    # Remove non-letter chars from front & back
-    first = re.sub(r"^[^A-Za-z]+|[^A-Za-z]+$", "", first)
-    last = re.sub(r"^[^A-Za-z]+|[^A-Za-z]+$", "", last)
-
-    return first, last
-
-
-
-
-
-def normalize_date(val):
-    if pd.isna(val) or str(val).strip() == "":
-        return ""
-
-    try:
-        # Case 1: already datetime-like
-        if hasattr(val, "date"):
-            return val.date()
-
-        s = str(val).strip()
-
-        # Try pandas intelligent parser FIRST (handles Nov, timestamps, ISO, etc.)
-        dt = pd.to_datetime(s, errors="coerce", dayfirst=False)
-        if not pd.isna(dt):
-            return dt.date()
-
-        # Manual fallback for numeric ambiguity
-        parts = re.split(r"[\/\-]", s.split()[0])
-        if len(parts) < 3:
-            return ""
-
-        a, b, c = parts
-
-        if not (a.isdigit() and b.isdigit() and c.isdigit()):
-            return ""
-
-        a, b, c = int(a), int(b), int(c)
-
-        # Detect format
-        if a > 12:
-            day, month = a, b
-        elif b > 12:
-            month, day = a, b
-        else:
-            day, month = a, b  # default dd/mm
-
-        year = c if c > 31 else c + 2000
-
-        return pd.Timestamp(year=year, month=month, day=day).date()
-
-    except Exception:
-        return ""
-
-
-
-
 # --------------------------------------------------
 # BUILD FINAL DATASET
 # --------------------------------------------------
@@ -341,6 +305,25 @@ FINAL_SCHEMA = [
 ]
 
 
+st.subheader("🧹 Duplicates")
+col1, col2 = st.columns(2)
+with col1:
+    dedup_key = st.selectbox("Duplicate when same", list(DEDUP_KEY_OPTIONS), key="dedup_key")
+with col2:
+    dedup_policy = st.selectbox("Row to keep", list(DEDUP_POLICY_OPTIONS), key="dedup_policy")
+
+export_format = st.radio("Download format", list(EXPORT_OPTIONS), horizontal=True, key="export_format")
+
+
+def download_frame(label, df, file_stem):
+    # written chunk by chunk to a spooled file instead of one big to_csv() string
+    fmt = EXPORT_OPTIONS[export_format]
+    mime, extension = EXPORT_FORMATS[fmt]
+
+    with export_frame(df, fmt) as export:
+        st.download_button(label, export.read(), file_name=file_stem + extension, mime=mime)
+
+
 if st.button("✅ Generate Final Dataset"):
 
     temp_df = {}
@@ -367,13 +350,30 @@ if st.button("✅ Generate Final Dataset"):
     temp_df = pd.DataFrame(temp_df)
 
     # ---- NAME SPLIT ----
-    first_last = temp_df["Name"].apply(split_name)
-    temp_df["First Name"] = first_last.apply(lambda x: x[0])
-    temp_df["Last Name"] = first_last.apply(lambda x: x[1])
+    first_last = split_name_series(temp_df["Name"])
+    temp_df["First Name"] = first_last["First Name"]
+    temp_df["Last Name"] = first_last["Last Name"]
     temp_df.drop(columns=["Name"], inplace=True)
 
     # ---- DATE NORMALIZATION ----
-    temp_df["Date of Data Addition"] = temp_df["Date of Data Addition"].apply(normalize_date)
+    temp_df["Date of Data Addition"] = normalize_date_series(temp_df["Date of Data Addition"], cache=clean_cache)
+
+    # ---- PROVENANCE ----
+    # mapped columns the first pass already cleaned are not cleaned again
+    # (see STABLE_CLEANERS); a skipped email column keeps its flag
+    cleaned_kinds = cleaned_df.attrs.get("cleaned", {})
+    provenance = {
+        field: cleaned_kinds[mapping[field]]
+        for field in REQUIRED_FIELDS
+        if field != "Name" and mapping.get(field) in cleaned_kinds
+    }
+
+    flag_cols = []
+    if provenance.get("Email") == "Email ID" and "Email_Valid" in cleaned_df.columns:
+        # Phone_Valid slot first (refilled by the phone cleaner), keeps the column order
+        temp_df["Phone_Valid"] = ""
+        temp_df["Email_Valid"] = cleaned_df["Email_Valid"]
+        flag_cols += ["Phone_Valid", "Email_Valid"]
 
     # ---- FINAL COLUMN ORDER ----
     final_df = temp_df[
@@ -389,30 +389,79 @@ if st.button("✅ Generate Final Dataset"):
             "Source of Data",
             "Stakeholder Category",
             "Date of Data Addition",
-        ]
+        ] + flag_cols
     ]
-
-    final_df = final_df.drop_duplicates(keep="last")
-    final_df = run_cleaning_pipeline2(final_df)
+    final_df.attrs["cleaned"] = provenance
+
+    final_df = run_cleaning_pipeline2(
+        final_df,
+        cache=clean_cache,
+        dedup={
+            "keys": DEDUP_KEY_OPTIONS[dedup_key],
+            "policy": DEDUP_POLICY_OPTIONS[dedup_policy],
+            "date_column": "Date of Data Addition",
+        }
+    )
     st.session_state["final_df"] = final_df.copy()
+    # identifies this dataset: the master merger writes it only once
+    st.session_state["final_df_id"] = hashlib.sha256(
+        pd.util.hash_pandas_object(final_df, index=False).to_numpy().tobytes()
+    ).hexdigest()
 
 
     st.success("Final dataset ready")
+    st.caption(f"Clean cache hit rate: {clean_cache.hit_rate:.1%} ({len(clean_cache)} cached values)")
+    usage = upload_store.disk_usage()
+    st.caption(f"Upload store: {usage['entries']} files, {usage['bytes'] / 1024 ** 2:.1f} MB on disk")
 
     st.subheader("📁 Final Preview")
     st.dataframe(final_df.head(10))
 
-    st.download_button(
-        "⬇️ Download Final CSV",
-        final_df.to_csv(index=False),
-        file_name="final_cleaned_dataset.csv",
-        mime="text/csv"
-    )
+    download_frame("⬇️ Download Final Dataset", final_df, "final_cleaned_dataset")
 
 
 st.divider()
 st.header("➕ Master File Merger (Row-wise)")
 
+
+@st.cache_resource(max_entries=MASTER_CACHE_ENTRIES, ttl=MASTER_CACHE_TTL)
+def get_master_store(name):
+    # one table per master name in the shared SQLite file, created on first merge
+    return MasterStore(table=name)
+
+
+@st.cache_resource(ttl=MASTER_CACHE_TTL)
+def expire_master_sessions():
+    # drops empty / long unused session masters, at most once per TTL
+    return expire_sessions()
+
+
+expire_master_sessions()
+
+
+def mobile_column(df):
+    # the final dataset names it "Phone Number", uploads may use the schema name
+    for col in ("Phone Number", "Mobile Number"):
+        if col in df.columns:
+            return col
+    return None
+
+
+# a private master per session unless a shared name is entered
+if "master_name" not in st.session_state:
+    st.session_state["master_name"] = SESSION_PREFIX + uuid.uuid4().hex[:8]
+
+master_name = st.text_input(
+    "Master dataset name",
+    key="master_name",
+    help="Masters are kept on this server across sessions. Anyone who enters the same name "
+         "reads and writes the same master; keep the generated name for a private one."
+)
+master_name = re.sub(r"[^0-9A-Za-z_-]", "_", master_name.strip()) or "master"
+
+master_store = get_master_store(master_name)
+st.caption(f"Master '{master_name}': {len(master_store)} rows (unique by mobile number)")
+
 append_file = st.file_uploader(
     "Upload file to append to the cleaned dataset",
     type=["csv", "xlsx", "xls"],
@@ -425,10 +474,11 @@ if append_file is not None:
     # LOAD FILE
     # -----------------------------
     try:
+        # read as text so mobile numbers keep their digits (no 9876543210.0)
         if append_file.name.endswith(".csv"):
-            append_df = pd.read_csv(append_file)
+            append_df = pd.read_csv(append_file, dtype=str)
         else:
-            append_df = pd.read_excel(append_file)
+            append_df = pd.read_excel(append_file, dtype=str)
     except Exception as e:
         st.error(f"Failed to read file: {e}")
         st.stop()
@@ -469,24 +519,35 @@ if append_file is not None:
     append_df = append_df[final_df.columns.union(append_df.columns)]
 
     # -----------------------------
-    # APPEND
+    # APPEND / UPSERT INTO MASTER
     # -----------------------------
+    merge_mode = st.radio(
+        "If a mobile number is already in the master",
+        ["Update existing row", "Keep existing row"],
+        horizontal=True
+    )
+
     if st.button("➕ Merge Rows"):
 
-        combined_df = pd.concat(
-            [final_df, append_df],
-            ignore_index=True
-        )
+        mode = "upsert" if merge_mode == "Update existing row" else "append"
 
-        st.success(f"Rows appended successfully. Total rows: {len(combined_df)}")
+        # the final dataset goes in once per generated dataset and master;
+        # later merges only write the appended batch
+        written = st.session_state.setdefault("master_written", set())
+        if (master_name, st.session_state["final_df_id"]) not in written:
+            master_store.write(final_df, mobile_column(final_df), mode=mode)
+            written.add((master_name, st.session_state["final_df_id"]))
 
-        st.subheader("📄 Combined Dataset Preview")
-        st.dataframe(combined_df.head(10))
+        changed = master_store.write(append_df, mobile_column(append_df), mode=mode)
 
-        st.download_button(
-            "⬇️ Download Combined Dataset",
-            combined_df.to_csv(index=False),
-            file_name="combined_appended_dataset.csv",
-            mime="text/csv"
+        st.success(
+            f"Rows merged successfully ({changed} added or updated). Total rows: {len(master_store)}"
         )
 
+    st.subheader("📄 Combined Dataset Preview")
+    st.dataframe(master_store.head(10))
+
+    # the whole master is read only when a download is asked for
+    if st.button("📦 Prepare Combined Dataset Download"):
+        download_frame("⬇️ Download Combined Dataset", master_store.read(), "combined_appended_dataset")
+
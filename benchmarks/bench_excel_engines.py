@@ -0,0 +1,75 @@
+"""
+Compares Excel reader engines on a generated registration workbook:
+pandas' default (openpyxl) against python-calamine, reading all columns
+and only the columns the cleaner maps.
+
+usage: python benchmarks/bench_excel_engines.py [--rows N] [--keep]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from data_cleaner import calamine_available, read_input_file
+
+MAPPED_COLUMNS = ["Name of the Teacher", "Mobile Number", "Email ID", "City", "State"]
+
+
+def make_workbook(path, rows):
+    rnd = random.Random(0)
+    df = pd.DataFrame({
+        "Timestamp": [f"18-Nov-2025 14:{i % 60:02d}:08" for i in range(rows)],
+        "Name of the Teacher": [f"Teacher {i}" for i in range(rows)],
+        "Mobile Number": [rnd.randint(6_000_000_000, 9_999_999_999) for _ in range(rows)],
+        "Email ID": [f"teacher{i}@example.com" for i in range(rows)],
+        "Name of the School": [rnd.choice(["ZPHS Nagpur", "St Xaviers High school"]) for _ in range(rows)],
+        "City": [rnd.choice(["Pune", "Nasik", "Bombay"]) for _ in range(rows)],
+        "State": [rnd.choice(["MH", "Maharashtra", "Karnataka"]) for _ in range(rows)],
+        **{f"Survey Question {q}": ["Agree"] * rows for q in range(20)},
+    })
+    df.to_excel(path, index=False)
+
+
+def time_read(path, **read_options):
+    start = time.perf_counter()
+    df = read_input_file(path, **read_options)
+    return time.perf_counter() - start, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--keep", action="store_true", help="keep the generated workbook")
+    args = parser.parse_args()
+
+    engines = ["openpyxl"]
+    if calamine_available():
+        engines.append("calamine")
+    else:
+        print("python-calamine not installed: only the default engine is measured")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "registrations.xlsx"
+        make_workbook(path, args.rows)
+        print(f"workbook: {args.rows} rows, {path.stat().st_size / 1e6:.1f} MB")
+
+        for engine in engines:
+            for label, usecols in (("all columns", None), ("mapped columns", MAPPED_COLUMNS)):
+                elapsed, rows = time_read(path, excel_engine=engine, usecols=usecols)
+                print(f"{engine:10s} {label:15s}: {elapsed:7.2f} s ({rows / elapsed:10.0f} rows/s)")
+
+        if args.keep:
+            target = Path("registrations_bench.xlsx")
+            target.write_bytes(path.read_bytes())
+            print(f"workbook kept at {target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Import-time benchmark for data_cleaner.
+
+Importing the cleaning library must only build the rule tables; the Phase 1
+batch job runs through run_phase1() / `python data_cleaner.py`.
+
+usage: python benchmarks/bench_import.py [--runs N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def time_import(statement, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=REPO_ROOT, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = time_import("import pandas", args.runs)
+    total = time_import("import data_cleaner", args.runs)
+
+    print(f"import pandas        : {baseline * 1000:8.1f} ms")
+    print(f"import data_cleaner  : {total * 1000:8.1f} ms")
+    print(f"data_cleaner overhead: {(total - baseline) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Rows/second of standardize_school_name before and after the compiled
+SchoolNameRewriter, on a generated column of school names.
+
+usage: python benchmarks/bench_school_names.py [--rows N]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from data_cleaner import SCHOOL_REPLACEMENTS, standardize_school_name
+
+SAMPLE_NAMES = [
+    "ZPHS Nagpur",
+    "z.p.p.s. school no 12 satara",
+    "St Xaviers High school",
+    "R.A.A. vidyalaya pune",
+    "Jr college of sci",
+    "Mary s convent school no325Satara",
+    "(old) St. Joseph s hs",
+    "sndt women s college mumbai",
+    "smt. xyz vidya mandir",
+    "tmc school no. 5 thane",
+    "ashramshala nasik",
+    "new english school",
+]
+
+
+def legacy_standardize_school_name(val, max_passes=6):
+    """Reference implementation: one re.sub per pattern, per pass."""
+    if pd.isna(val) or str(val).strip() == "":
+        return val
+
+    s = str(val).lower()
+    s = re.sub(r"\([^)]*\)", "", s)
+    s = re.sub(r"[^a-z0-9\s]", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+
+    for _ in range(max_passes):
+        before = s
+        for pattern, repl in SCHOOL_REPLACEMENTS.items():
+            s = re.sub(pattern, repl, s, flags=re.IGNORECASE)
+        if s == before:
+            break
+
+    result = s.title()
+    result = re.sub(r"'S\b", "'s", result)
+    return result
+
+
+def rows_per_second(func, values):
+    start = time.perf_counter()
+    results = [func(v) for v in values]
+    elapsed = time.perf_counter() - start
+    return len(values) / elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    # Suffix keeps values distinct so the benchmark measures the rewrite
+    # itself rather than the column-level unique-value cache.
+    values = [f"{rnd.choice(SAMPLE_NAMES)} {i}" for i in range(args.rows)]
+
+    before, expected = rows_per_second(legacy_standardize_school_name, values)
+    after, results = rows_per_second(standardize_school_name, values)
+
+    if results != expected:
+        raise SystemExit("compiled rewriter output differs from legacy implementation")
+
+    print(f"rows             : {args.rows}")
+    print(f"legacy re.sub    : {before:10.0f} rows/s")
+    print(f"compiled rewriter: {after:10.0f} rows/s")
+    print(f"speedup          : {after / before:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
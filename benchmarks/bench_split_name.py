@@ -0,0 +1,70 @@
+"""
+First / Last name splitting on a generated column: the row-wise
+split_name apply (plus the two tuple-unpacking applies the app used)
+against split_name_series.
+
+usage: python benchmarks/bench_split_name.py [--rows N] [--distinct N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from data_cleaner import split_name, split_name_series
+
+TITLES = ["", "", "", "Mr. ", "mrs ", "Dr.", "Sir ", "ms. "]
+FIRST = ["Ravi", "anita", "K.R.", "José", "o'neil", "Sunil", "A.", "priya", "Mohammed", "g."]
+MIDDLE = ["", "", "Kumar ", "S. ", "van de "]
+LAST = ["Sharma", "patil", "G.", "D'Souza", "khan.", "Iyer", "(teacher)", "Reddy", "", "deshmukh"]
+
+
+def legacy_split(series):
+    first_last = series.apply(split_name)
+    return first_last.apply(lambda x: x[0]), first_last.apply(lambda x: x[1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    names = [
+        f"{rnd.choice(TITLES)}{rnd.choice(FIRST)} {rnd.choice(MIDDLE)}{rnd.choice(LAST)}{i or ''}"
+        for i in range(args.distinct)
+    ]
+    series = pd.Series([rnd.choice(names) for _ in range(args.rows)])
+
+    start = time.perf_counter()
+    first, last = legacy_split(series)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = split_name_series(series)
+    after = time.perf_counter() - start
+
+    if not (first.tolist() == result["First Name"].tolist() and last.tolist() == result["Last Name"].tolist()):
+        raise SystemExit("split_name_series output differs from split_name")
+
+    # empty and all-missing columns keep split_name's ("", "")
+    for edge in (pd.Series([], dtype=object), pd.Series([None, float("nan")])):
+        first, last = legacy_split(edge)
+        result = split_name_series(edge)
+        if not (first.tolist() == result["First Name"].tolist() and last.tolist() == result["Last Name"].tolist()):
+            raise SystemExit("split_name_series output differs from split_name on empty/missing names")
+
+    print(f"rows              : {args.rows} ({args.distinct} distinct)")
+    print(f"split_name apply  : {args.rows / before:10.0f} rows/s")
+    print(f"split_name_series : {args.rows / after:10.0f} rows/s")
+    print(f"speedup           : {before / after:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
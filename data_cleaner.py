@@ -1,13 +1,44 @@
 import pandas as pd
+import numpy as np
+import argparse
+import codecs
+import functools
+import glob
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
 import re
+import sys
+import tempfile
+import time
+import warnings
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:
+    # public only from pandas 2.2; requirements allow pandas >= 2.0
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
 # -----------------------------
 # CONFIG
 # -----------------------------
 INPUT_FOLDER = "input_files"
 OUTPUT_FOLDER = "output_phase1"
-Path(OUTPUT_FOLDER).mkdir(exist_ok=True)
+CLEAN_CACHE_SIZE = 200_000
+STREAM_CHUNKSIZE = 100_000
+EXCEL_ENGINE = "auto"   # "auto" = python-calamine when installed, else pandas default
+ENCODING_SAMPLE_SIZE = 1 << 20   # bytes inspected per CSV to pick its encoding
+DATE_SAMPLE_SIZE = 1000          # distinct values used to infer a date column's format
+EXPORT_CHUNKSIZE = 100_000
+OUTPUT_FORMAT = "csv"            # Phase 1 output: "csv", "csv.gz" or "parquet"
+EXPORT_SPOOL_SIZE = 64 * 1024 ** 2   # exports larger than this spill to a temp file on disk
+SHARD_FOLDER = ".shards"         # incremental runs: manifest + cleaned shards, under the output folder
 
 # -----------------------------
 # COLUMN ALIASES
@@ -475,27 +506,71 @@ MULTI_WORD_CITIES = {
 # ---------------------------------------------
 # SCHOOL NAME STANDARDIZER 
 # ---------------------------------------------
-    
+
+class SchoolNameRewriter:
+    """
+    Compiled form of a replacement table such as SCHOOL_REPLACEMENTS.
+
+    Rules are compiled once and grouped into blocks, each guarded by a single
+    combined alternation. A pass scans every guard once and only runs the
+    rules of blocks whose guard matches, so rules still apply in table order
+    and the output is identical to running re.sub for every pattern. A pass
+    in which no guard matches cannot change the value: fixed point reached.
+    """
+
+    def __init__(self, replacements, block_size=8):
+        self.rules = [
+            (re.compile(pattern, re.IGNORECASE), repl)
+            for pattern, repl in replacements.items()
+        ]
+        self.blocks = [
+            (self._combine(self.rules[i:i + block_size]), self.rules[i:i + block_size])
+            for i in range(0, len(self.rules), block_size)
+        ]
+
+    @staticmethod
+    def _combine(rules):
+        return re.compile(
+            "|".join(f"(?:{pattern.pattern})" for pattern, _ in rules),
+            re.IGNORECASE
+        )
+
+    def rewrite(self, s, max_passes=6):
+        for _ in range(max_passes):
+            before = s
+            for guard, rules in self.blocks:
+                if guard.search(s):
+                    for pattern, repl in rules:
+                        s = pattern.sub(repl, s)
+
+            if s == before:  # convergence reached
+                break
+
+        return s
+
+
+SCHOOL_REWRITER = SchoolNameRewriter(SCHOOL_REPLACEMENTS)
+
+_BRACKET_NOISE_RE = re.compile(r"\([^)]*\)")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+_POSSESSIVE_RE = re.compile(r"'S\b")
+
+
 def standardize_school_name(val, max_passes=6):
     if pd.isna(val) or str(val).strip() == "":
         return val
 
     s = str(val).lower()
-    s = re.sub(r"\([^)]*\)", "", s)          # remove bracket noise
-    s = re.sub(r"[^a-z0-9\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _BRACKET_NOISE_RE.sub("", s)          # remove bracket noise
+    s = _NON_ALNUM_RE.sub(" ", s)
+    s = _WHITESPACE_RE.sub(" ", s).strip()
 
     # iterative replacement loop
-    for _ in range(max_passes):
-        before = s
-        for pattern, repl in SCHOOL_REPLACEMENTS.items():
-            s = re.sub(pattern, repl, s, flags=re.IGNORECASE)
+    s = SCHOOL_REWRITER.rewrite(s, max_passes=max_passes)
 
-        if s == before:  # convergence reached
-            break
-    
     result = s.title()
-    result = re.sub(r"'S\b", "'s", result)
+    result = _POSSESSIVE_RE.sub("'s", result)
     return result
 
 
@@ -584,15 +659,282 @@ def clean_phone(val):
     return digits, valid
 
 
+def clean_phone_series(series):
+    """
+    Vectorized clean_phone over a whole column (Series.str + NumPy).
+    returns: (digits Series, Phone_Valid Series)
+    """
+    missing = series.isna().to_numpy(dtype=bool)
+    text = series.astype(str).where(~missing, "")
+    blank = missing | text.str.strip().eq("").to_numpy(dtype=bool)
+
+    # Remove everything except digits
+    digits = text.str.replace(r"[^0-9]", "", regex=True)
+
+    # Remove country code 91 safely
+    country_code = digits.str.startswith("91") & digits.str.len().gt(10)
+    digits = digits.where(~country_code, digits.str[-10:])
+
+    # Remove ONLY 1 or 2 leading zeros
+    digits = digits.str.replace(r"^0{1,2}", "", regex=True)
+    digits = digits.where(~blank, "")
+
+    valid = np.where(digits.str.len().eq(10).to_numpy(dtype=bool), "Yes", "No")
+    return digits.rename(None), pd.Series(valid, index=series.index)
+
+
+
+EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+\.\w+")
+
 
 def clean_email(val):
     if pd.isna(val) or str(val).strip() == "":
         return val, ""
     email = str(val).strip().lower()
-    pattern = r"^[\w\.-]+@[\w\.-]+\.\w+$"
-    valid = "Yes" if re.match(pattern, email) else "No"
+    valid = "Yes" if EMAIL_RE.fullmatch(email) else "No"
     return email, valid
 
+
+def clean_email_series(series):
+    """
+    Vectorized clean_email over a whole column: one strip / lower /
+    fullmatch pass with the compiled EMAIL_RE. Missing and blank values
+    are kept as they are with an empty Email_Valid flag.
+    returns: (emails Series, Email_Valid Series)
+    """
+    values = series.astype(object).to_numpy(copy=True)
+    flags = np.full(len(values), "", dtype=object)
+
+    missing = series.isna().to_numpy(dtype=bool)
+    # object dtype keeps Python str / re semantics on every string backend
+    text = series[~missing].astype(str).astype(object).str.strip()
+    present = np.flatnonzero(~missing)[text.ne("").to_numpy(dtype=bool)]
+    text = text[text.ne("")].str.lower()
+
+    values[present] = text.to_numpy()
+    flags[present] = np.where(text.str.fullmatch(EMAIL_RE).to_numpy(dtype=bool), "Yes", "No")
+
+    return (
+        pd.Series(values, index=series.index),
+        pd.Series(flags, index=series.index),
+    )
+
+
+# -----------------------------
+# NAME SPLITTING
+# -----------------------------
+_INITIAL_DOT_RE = re.compile(r"\.(?=\S)")
+_NAME_TITLE_RE = re.compile(r"^(mr|mrs|mister|miss|misses|ms|sir|mam|madam|dr)\.?\s+", re.IGNORECASE)
+_NON_LETTER_EDGES_RE = re.compile(r"^[^A-Za-z]+|[^A-Za-z]+$")
+
+
+def split_name(name):
+    if pd.isna(name) or str(name).strip() == "":
+        return "", ""
+
+    s = str(name).strip()
+
+    # ----------------------------------
+    # 0. Add space after every dot
+    # ----------------------------------
+    s = re.sub(r"\.(?=\S)", ". ", s)
+
+    # ----------------------------------
+    # 1. Remove common titles / honorifics
+    # ----------------------------------
+    s = re.sub(
+        r"^(mr|mrs|mister|miss|misses|ms|sir|mam|madam|dr)\.?\s+",
+        "",
+        s,
+        flags=re.IGNORECASE
+    )
+
+    # ----------------------------------
+    # 2. Normalize spaces
+    # ----------------------------------
+    s = re.sub(r"\s+", " ", s).strip()
+
+    parts = s.split()
+    if not parts:
+        return "", ""
+
+    # ----------------------------------
+    # 3. Single word name
+    # ----------------------------------
+    if len(parts) == 1:
+        first = re.sub(r"^[^A-Za-z]+|[^A-Za-z]+$", "", parts[0])
+        return first, ""
+
+    # ----------------------------------
+    # 4. First & Last name cleanup
+    # ----------------------------------
+    first = parts[0]
+    last = parts[-1]
+
+    # Remove trailing dot from initials (e.g., G.)
+    last = re.sub(r"\.$", "", last)
+
+    # Remove non-letter chars from front & back
+    first = re.sub(r"^[^A-Za-z]+|[^A-Za-z]+$", "", first)
+    last = re.sub(r"^[^A-Za-z]+|[^A-Za-z]+$", "", last)
+
+    return first, last
+
+
+def split_name_series(series):
+    """
+    Vectorized split_name over a whole column: each distinct name is split
+    once with Series.str and the precompiled patterns above.
+    returns: DataFrame with "First Name" / "Last Name", same index as series
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+    # no names at all: str.partition would return a frame without columns
+    if len(uniques) == 0:
+        blank = _object_array([""] * len(series))
+        return pd.DataFrame({"First Name": blank, "Last Name": blank.copy()}, index=series.index)
+
+    # object dtype keeps Python str / re semantics on every string backend
+    s = pd.Series(uniques, dtype=object).astype(str).astype(object).str.strip()
+    s = s.str.replace(_INITIAL_DOT_RE, ". ", regex=True)
+    s = s.str.replace(_NAME_TITLE_RE, "", regex=True)
+    s = s.str.replace(_WHITESPACE_RE, " ", regex=True).str.strip()
+
+    # single spaces only now: first / last word without building lists.
+    # Stripping non-letters also covers the trailing dot of initials.
+    first = s.str.partition(" ")[0].str.replace(_NON_LETTER_EDGES_RE, "", regex=True)
+    last = s.str.rpartition(" ")[2].str.replace(_NON_LETTER_EDGES_RE, "", regex=True)
+    last = last.where(s.str.contains(" ", regex=False), "")
+
+    # missing names (code -1) map to the extra "" slot
+    first = _object_array(list(first) + [""])[codes]
+    last = _object_array(list(last) + [""])[codes]
+
+    return pd.DataFrame({"First Name": first, "Last Name": last}, index=series.index)
+
+
+# -----------------------------
+# DATE NORMALIZATION
+# -----------------------------
+def normalize_date(val):
+    if pd.isna(val) or str(val).strip() == "":
+        return ""
+
+    try:
+        # Case 1: already datetime-like
+        if hasattr(val, "date"):
+            return val.date()
+
+        s = str(val).strip()
+
+        # Try pandas intelligent parser FIRST (handles Nov, timestamps, ISO, etc.)
+        dt = pd.to_datetime(s, errors="coerce", dayfirst=False)
+        if not pd.isna(dt):
+            return dt.date()
+
+        # Manual fallback for numeric ambiguity
+        parts = re.split(r"[\/\-]", s.split()[0])
+        if len(parts) < 3:
+            return ""
+
+        a, b, c = parts
+
+        if not (a.isdigit() and b.isdigit() and c.isdigit()):
+            return ""
+
+        a, b, c = int(a), int(b), int(c)
+
+        # Detect format
+        if a > 12:
+            day, month = a, b
+        elif b > 12:
+            month, day = a, b
+        else:
+            day, month = a, b  # default dd/mm
+
+        year = c if c > 31 else c + 2000
+
+        return pd.Timestamp(year=year, month=month, day=day).date()
+
+    except Exception:
+        return ""
+
+
+def infer_date_format(values, sample_size=DATE_SAMPLE_SIZE):
+    """
+    Dominant strftime format of a sample of date strings, or None.
+    Each value votes for its month-first guess and, when different, its
+    day-first guess, so unambiguous values (13/04, 04/13) decide the
+    column; a tie keeps month-first like the row-wise parser.
+    """
+    values = list(values)
+    if len(values) > sample_size:
+        step = len(values) / sample_size
+        values = [values[int(i * step)] for i in range(sample_size)]
+
+    votes = Counter()
+    month_first = set()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for s in values:
+            fmt = guess_datetime_format(s, dayfirst=False)
+            fmt_dayfirst = guess_datetime_format(s, dayfirst=True)
+            if fmt:
+                votes[fmt] += 1
+                month_first.add(fmt)
+            if fmt_dayfirst and fmt_dayfirst != fmt:
+                votes[fmt_dayfirst] += 1
+
+    if not votes:
+        return None
+    return max(votes, key=lambda fmt: (votes[fmt], fmt in month_first))
+
+
+def normalize_date_series(series, cache=None):
+    """
+    Column-level normalize_date. Distinct values are parsed once: strings
+    with one vectorized to_datetime in the column's inferred format, and
+    only values that fail it (other formats, non-strings) go through
+    normalize_date, memoized in the CleanCache.
+    Ambiguous dd/mm vs mm/dd strings follow the column's dominant format.
+    returns: Series of datetime.date / "" (same as normalize_date)
+    """
+    if cache is None:
+        cache = CleanCache()
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    results = _object_array([""] * len(uniques))
+
+    is_text = np.fromiter((isinstance(v, str) for v in uniques), dtype=bool, count=len(uniques))
+    text = pd.Series(uniques[is_text], dtype=object).str.strip()
+    positions = np.flatnonzero(is_text)
+
+    fmt = infer_date_format(text[text.ne("")])
+    parsed = np.zeros(len(uniques), dtype=bool)
+
+    if fmt is not None:
+        try:
+            dates = pd.to_datetime(text, format=fmt, errors="coerce")
+        except (ValueError, TypeError):
+            # e.g. mixed time zones: leave everything to the row-wise parser
+            dates = None
+
+        # pandas 2.x returns object (not raising) for mixed offsets; utc=True
+        # would shift local dates, so those also go to the row-wise parser
+        if dates is not None and pd.api.types.is_datetime64_any_dtype(dates):
+            ok = dates.notna().to_numpy(dtype=bool)
+            results[positions[ok]] = dates[ok].dt.date.to_numpy()
+            parsed[positions[ok]] = True
+
+    for i in np.flatnonzero(~parsed):
+        results[i] = cache.get((normalize_date,), uniques[i])
+
+    # missing values (code -1) map to the extra "" slot
+    results = np.append(results, _object_array([""]))
+    return pd.Series(results[codes], index=series.index)
+
+
 def normalize_col(col):
     return re.sub(r"[^a-z0-9]", " ", col.lower()).strip()
 
@@ -634,6 +976,91 @@ def find_column(df_cols, aliases):
     return None
 
 
+class ColumnResolver:
+    """
+    find_column for every canonical field in one pass over the header.
+    Aliases are compiled once per field (exact set, starts-with prefixes,
+    one whole-word and one substring alternation). Each column gets the
+    best tier it reaches per field, and a field resolves to the column
+    with the lowest (tier, position) - the same column the tier-by-tier
+    scans of find_column return. Results are cached per header.
+    """
+
+    EXACT, STARTS_WITH, WHOLE_WORD, SUBSTRING = range(4)
+
+    def __init__(self, aliases, cache_size=128):
+        self.fields = []
+        for canonical, names in aliases.items():
+            escaped = "|".join(re.escape(alias) for alias in names)
+            self.fields.append((
+                canonical,
+                frozenset(names),
+                tuple(alias + " " for alias in names),
+                re.compile(rf"\b(?:{escaped})\b") if names else None,
+                re.compile(escaped) if names else None,
+            ))
+        # every tier implies a substring match: one scan drops the columns
+        # that cannot match any field
+        every_alias = sorted({alias for names in aliases.values() for alias in names}, key=len, reverse=True)
+        self._any_alias = re.compile("|".join(re.escape(alias) for alias in every_alias)) if every_alias else None
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def _tier(self, norm, exact, prefixes, whole_word, substring):
+        if norm in exact:
+            return self.EXACT
+        if norm.startswith(prefixes):
+            return self.STARTS_WITH
+        if whole_word is not None and whole_word.search(norm):
+            return self.WHOLE_WORD
+        if substring is not None and substring.search(norm):
+            return self.SUBSTRING
+        return None
+
+    def resolve(self, columns):
+        """
+        columns: header (any iterable of column names)
+        returns: {canonical: column} for the fields that matched
+        """
+        key = tuple(columns)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return dict(self._cache[key])
+
+        best = {}
+        for position, col in enumerate(key):
+            norm = normalize_col(col)
+            if self._any_alias is None or not self._any_alias.search(norm):
+                continue
+            for canonical, *patterns in self.fields:
+                tier = self._tier(norm, *patterns)
+                # columns come in header order: only a better tier replaces
+                if tier is not None and (canonical not in best or tier < best[canonical][0]):
+                    best[canonical] = (tier, position)
+
+        # field order of the alias table
+        resolved = {
+            canonical: key[best[canonical][1]]
+            for canonical, *_ in self.fields if canonical in best
+        }
+
+        self._cache[key] = resolved
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return dict(resolved)
+
+    def rename_map(self, columns):
+        """{column: canonical} like detect_columns (a later field wins a shared column)"""
+        detected_cols = {}
+        for canonical, col in self.resolve(columns).items():
+            detected_cols[col] = canonical
+        return detected_cols
+
+
+COLUMN_RESOLVER = ColumnResolver(COLUMN_ALIASES)
+
+
 def standardize_city(val, min_first_word_len=3):
     if pd.isna(val) or str(val).strip() == "":
         return val
@@ -677,6 +1104,81 @@ def standardize_city(val, min_first_word_len=3):
 
 
 
+class StateIndex:
+    """
+    Token / n-gram index over STATE_CORRECTIONS and VALID_STATES.
+
+    Text is split into word and non-word runs (the regex word boundaries),
+    so a phrase matches exactly where a whole-word regex would. Each value is
+    resolved with one tokenize-and-lookup pass: corrections are applied
+    left to right (longest phrase first), then the corrected tokens are
+    looked up against the valid states.
+    """
+
+    TOKEN_RE = re.compile(r"\w+|\W+")
+
+    def __init__(self, corrections, valid_states):
+        self.valid_states = set(valid_states)
+        self.corrections = self._build(corrections.items())
+        self.states = self._build((state, state) for state in valid_states)
+        # several states in one value: the first in valid_states order wins
+        self.state_rank = {state: rank for rank, state in enumerate(valid_states)}
+
+    @classmethod
+    def _build(cls, pairs):
+        index = {}
+        for phrase, target in pairs:
+            tokens = tuple(cls.TOKEN_RE.findall(phrase))
+            index.setdefault(tokens[0], {})[tokens] = (tuple(cls.TOKEN_RE.findall(target)), target)
+
+        # longest phrase first for every leading word
+        return {
+            first: sorted(entries.items(), key=lambda item: -len(item[0]))
+            for first, entries in index.items()
+        }
+
+    def correct(self, tokens):
+        out = []
+        i = 0
+        while i < len(tokens):
+            for phrase, (replacement, _) in self.corrections.get(tokens[i], ()):
+                if tuple(tokens[i:i + len(phrase)]) == phrase:
+                    out.extend(replacement)
+                    i += len(phrase)
+                    break
+            else:
+                out.append(tokens[i])
+                i += 1
+        return out
+
+    def find_state(self, tokens):
+        found = None
+        for i, token in enumerate(tokens):
+            for phrase, (_, state) in self.states.get(token, ()):
+                if tuple(tokens[i:i + len(phrase)]) == phrase:
+                    if found is None or self.state_rank[state] < self.state_rank[found]:
+                        found = state
+        return found
+
+    def resolve(self, s):
+        """
+        s: lower-cased, separator-normalized value
+        returns: matching valid state (lower case) or None
+        """
+        tokens = self.correct(self.TOKEN_RE.findall(s))
+
+        corrected = "".join(tokens)
+        if corrected in self.valid_states:
+            return corrected
+
+        return self.find_state(tokens)
+
+
+STATE_INDEX = StateIndex(STATE_CORRECTIONS, VALID_STATES)
+
+_STATE_SEPARATORS_RE = re.compile(r"[,\-/.()]")
+
+
 def standardize_state(val):
     if pd.isna(val) or str(val).strip() == "":
         return ""
@@ -686,267 +1188,1505 @@ def standardize_state(val):
     # ----------------------------------
     # 1. Normalize separators
     # ----------------------------------
-    s = re.sub(r"[,\-/.()]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _STATE_SEPARATORS_RE.sub(" ", s)
+    s = _WHITESPACE_RE.sub(" ", s).strip()
 
     # ----------------------------------
-    # 2. Apply spelling corrections (global)
+    # 2. Spelling corrections, full-string and
+    #    address-safe state match (one pass)
     # ----------------------------------
-    for wrong, correct in STATE_CORRECTIONS.items():
-        s = re.sub(rf"\b{re.escape(wrong)}\b", correct, s)
+    state = STATE_INDEX.resolve(s)
 
     # ----------------------------------
-    # 3. Direct full-string match
+    # 3. Nothing found → return empty
     # ----------------------------------
-    if s in VALID_STATES:
-        return s.title()
+    return state.title() if state else ""
 
-    # ----------------------------------
-    # 4. Substring scan (address-safe)
-    # ----------------------------------
-    for state in VALID_STATES:
-        if re.search(rf"\b{re.escape(state)}\b", s):
-            return state.title()
+# ---------------------------------------------
+# COLUMN-LEVEL CLEANING (UNIQUE VALUES)
+# ---------------------------------------------
 
-    # ----------------------------------
-    # 5. Nothing found → return empty
-    # ----------------------------------
-    return ""
+class CleanCache:
+    """
+    Bounded LRU cache of cleaned values, shared across files in one run.
+    Keys are (cleaners, value type, value) so 1 and 1.0 stay distinct.
+    """
 
-# -----------------------------
-# LOAD FILES
-# -----------------------------
-dfs = []
-files = list(Path(INPUT_FOLDER).glob("*.xls*")) + list(Path(INPUT_FOLDER).glob("*.csv"))
+    def __init__(self, maxsize=CLEAN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
 
-if not files:
-    raise FileNotFoundError("No input files found")
+    def __len__(self):
+        return len(self._data)
 
-for file in files:
-    try:
-        df = pd.read_csv(file, encoding="utf-8") if file.suffix == ".csv" else pd.read_excel(file)
-        
-    except UnicodeDecodeError:
-        df = pd.read_csv(file, encoding="cp1252") if file.suffix == ".csv" else pd.read_excel(file)
-        
+    def get(self, funcs, val):
+        key = (funcs, type(val), val)
+        try:
+            result = self._data[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return result
 
-    df["__source_file"] = file.name
-    dfs.append(df)
+        result = _apply_cleaners(funcs, val)
+        self._data[key] = result
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return result
 
-raw_df = pd.concat(dfs, ignore_index=True)
-original_count = len(raw_df)
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "hit_rate": self.hit_rate,
+        }
+
+
+def _apply_cleaners(funcs, val):
+    for func in funcs:
+        val = func(val)
+    return val
+
+
+def _clean_uniques(series, funcs, cache):
+    """
+    Factorizes the column and cleans each distinct value once.
+    returns: (codes, cleaned values) - codes index into cleaned values
+    """
+    if cache is None:
+        cache = CleanCache()
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    cleaned = [cache.get(funcs, val) for val in uniques]
+
+    # Missing values bypass the cache (NaN != NaN) and are cleaned once
+    missing = np.flatnonzero(codes == -1)
+    if len(missing):
+        cleaned.append(_apply_cleaners(funcs, series.iloc[missing[0]]))
+        codes = np.where(codes == -1, len(cleaned) - 1, codes)
+
+    return codes, cleaned
+
+
+def _object_array(values):
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
 
-# -----------------------------
-# COLUMN DETECTION & RENAMING
-# -----------------------------
-detected_cols = {}
-for canonical, aliases in COLUMN_ALIASES.items():
-    found = find_column(raw_df.columns, aliases)
-    if found:
-        detected_cols[found] = canonical
 
-raw_df = raw_df.rename(columns=detected_cols)
+def clean_column(series, *funcs, cache=None):
+    """
+    Equivalent to chaining series.apply(func) for each func, but every
+    distinct value is cleaned only once and mapped back through the codes.
+    """
+    codes, cleaned = _clean_uniques(series, funcs, cache)
+    return pd.Series(_object_array(cleaned)[codes], index=series.index, name=series.name)
+
 
 # -----------------------------
-# CLEANING
+# LOADING
 # -----------------------------
-if "Name" in raw_df.columns:
-    raw_df["Name"] = raw_df["Name"].apply(normalize_text)
+@functools.lru_cache(maxsize=None)
+def calamine_available():
+    """python-calamine is installed and pandas (>= 2.2) can use it."""
+    if importlib.util.find_spec("python_calamine") is None:
+        return False
+    major, minor = (int(part) for part in pd.__version__.split(".")[:2])
+    return (major, minor) >= (2, 2)
 
-if "City" in raw_df.columns:
-    raw_df["City"] = raw_df["City"].apply(normalize_text)
-    raw_df["City"] = raw_df["City"].apply(standardize_city)
 
-if "State" in raw_df.columns:
-    raw_df["State"] = raw_df["State"].apply(normalize_text)
-    raw_df["State"] = raw_df["State"].apply(standardize_state)
+@functools.lru_cache(maxsize=None)
+def string_dtype():
+    """
+    Dtype identifier columns are read as: the compact pyarrow-backed
+    "string[pyarrow]" when pyarrow is installed, else str.
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        return str
+    return "string[pyarrow]"
 
 
-if "School/College" in raw_df.columns:
-    raw_df["School/College"] = raw_df["School/College"].apply(standardize_school_name)
+# canonical columns always read as text, never type-inferred: a mobile
+# number column with blanks would otherwise load as float64 and come back
+# as "9876543210.0" (or "9.87654321e9") before clean_phone sees it
+IDENTIFIER_COLUMNS = ("Phone Number", "Email ID")
 
-if "Phone Number" in raw_df.columns:
-    raw_df[["Phone Number", "Phone_Valid"]] = raw_df["Phone Number"].apply(
-        lambda x: pd.Series(clean_phone(x))
-    )
 
-if "Email ID" in raw_df.columns:
-    raw_df[["Email ID", "Email_Valid"]] = raw_df["Email ID"].apply(
-        lambda x: pd.Series(clean_email(x))
-    )
+def identifier_dtypes(columns):
+    """
+    columns: header of one input file
+    returns: {column: string_dtype()} for its columns detected as one of
+             IDENTIFIER_COLUMNS; other columns keep pandas' inference
+    """
+    dtype = string_dtype()
+    return {
+        col: dtype
+        for col, canonical in detect_columns(pd.Index(columns)).items()
+        if canonical in IDENTIFIER_COLUMNS
+    }
+
+
+def resolve_excel_engine(excel_engine=EXCEL_ENGINE):
+    """
+    "auto" / "calamine": python-calamine when available, otherwise None so
+    pandas picks its default (openpyxl for .xlsx, xlrd for .xls).
+    Any other value is passed to pd.read_excel unchanged.
+    """
+    if excel_engine in ("auto", "calamine"):
+        return "calamine" if calamine_available() else None
+    return excel_engine
 
-if "School/College" in raw_df.columns:
-    raw_df["School/College"] = (
-        raw_df["School/College"]
-        .apply(drop_trailing_location)
+
+def _usecols(usecols):
+    """
+    Column lists become a membership test, so files that lack some of the
+    columns do not make pandas raise.
+    """
+    if usecols is None or callable(usecols):
+        return usecols
+    return frozenset(usecols).__contains__
+
+
+def read_excel(file, excel_engine=EXCEL_ENGINE, usecols=None, sheet_name=0, **kwargs):
+    """
+    pd.read_excel with engine selection. sheet_name may be a list (or None
+    for all sheets); the selected sheets are stacked in workbook order.
+    """
+    df = pd.read_excel(
+        file,
+        engine=resolve_excel_engine(excel_engine),
+        usecols=_usecols(usecols),
+        sheet_name=sheet_name,
+        **kwargs
     )
+    if isinstance(df, dict):
+        df = pd.concat(df.values(), ignore_index=True)
+    return df
 
 
+def read_excel_identifiers(file, excel_engine=EXCEL_ENGINE, usecols=None, sheet_name=0):
+    """
+    read_excel in one pass with the identifier columns as text. Excel cells
+    are already typed, so the sheet is read untyped (dtype=object: ints,
+    floats, dates and text as stored), identifier_dtypes() columns become
+    strings and the other columns are inferred from their cell values.
+    Numbers stored as text cells stay text ("0123" is not turned into 123).
+    """
+    df = read_excel(file, excel_engine=excel_engine, usecols=usecols, sheet_name=sheet_name, dtype=object)
+    return df.astype(identifier_dtypes(df.columns)).infer_objects()
 
-# ---------------------------------------------
-# STREAMLIT ENTRY POINT (DO NOT MODIFY LOGIC)
-# ---------------------------------------------
 
-def run_cleaning_pipeline(input_files):
+def _is_utf8(block, starts_file=True, ends_file=True):
+    if not starts_file:
+        # skip the tail of a character cut by the window start
+        cut = 0
+        while cut < min(3, len(block)) and 0x80 <= block[cut] <= 0xBF:
+            cut += 1
+        block = block[cut:]
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(block, final=ends_file)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def sniff_encoding(file, sample_size=ENCODING_SAMPLE_SIZE, windows=8):
     """
-    input_files: list of pathlib.Path objects
-    returns: cleaned pandas DataFrame
+    Picks utf-8-sig (BOM), utf-8 or cp1252 for a CSV in one read.
+    Files larger than sample_size are checked through `windows` evenly
+    spaced windows from head to tail, so a stray byte near the end is
+    still seen. sample_size=None validates the whole file.
     """
+    size = os.path.getsize(file)
+
+    with open(file, "rb") as fp:
+        bom = fp.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8
+        fp.seek(0)
+
+        if sample_size is None or size <= sample_size:
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            try:
+                for block in iter(lambda: fp.read(1 << 20), b""):
+                    decoder.decode(block)
+                decoder.decode(b"", final=True)
+                valid = True
+            except UnicodeDecodeError:
+                valid = False
+        else:
+            window = sample_size // windows
+            step = (size - window) / (windows - 1)
+            valid = True
+            for i in range(windows):
+                offset = int(i * step)
+                fp.seek(offset)
+                block = fp.read(window)
+                if not _is_utf8(block, offset == 0, offset + len(block) >= size):
+                    valid = False
+                    break
 
-    dfs = []
+    if not valid:
+        return "cp1252"
+    return "utf-8-sig" if bom else "utf-8"
 
-    for file in input_files:
+
+def is_csv(file):
+    # suffixes are matched case-insensitively, like expand_inputs does
+    return file.suffix.lower() == ".csv"
+
+
+def read_input_file(file, excel_engine=EXCEL_ENGINE, usecols=None, sheet_name=0, dtype=None):
+    """
+    file: pathlib.Path of a CSV / Excel file
+    excel_engine: see resolve_excel_engine
+    usecols: only parse these columns (names or a callable)
+    sheet_name: Excel sheet(s) to read
+    dtype: passed to the pandas reader (e.g. str to skip type inference);
+           None reads the identifier columns as text (identifier_dtypes)
+           and infers the rest
+    returns: raw DataFrame with a __source_file column; the CSV encoding
+             used is kept in df.attrs["encoding"]
+    """
+    if is_csv(file):
+        encoding = sniff_encoding(file)
         try:
-            df = pd.read_csv(file, encoding="utf-8") if file.suffix == ".csv" else pd.read_excel(file)
-            
+            if dtype is None:
+                dtype = identifier_dtypes(read_header(file, usecols=usecols, encoding=encoding))
+            df = pd.read_csv(file, encoding=encoding, usecols=_usecols(usecols), dtype=dtype)
         except UnicodeDecodeError:
-            df = pd.read_csv(file, encoding="cp1252") if file.suffix == ".csv" else pd.read_excel(file)
-            
+            # invalid byte outside the sampled windows
+            encoding = "cp1252"
+            df = pd.read_csv(file, encoding=encoding, usecols=_usecols(usecols), dtype=dtype)
+    else:
+        encoding = "excel"
+        if dtype is None:
+            df = read_excel_identifiers(file, excel_engine=excel_engine, usecols=usecols, sheet_name=sheet_name)
+        else:
+            df = read_excel(file, excel_engine=excel_engine, usecols=usecols, sheet_name=sheet_name, dtype=dtype)
+
+    df["__source_file"] = file.name
+    df.attrs["encoding"] = encoding
+    return df
+
+
+def file_report(file, df):
+    """One row of the per-file run summary."""
+    return {"File": file.name, "Rows": len(df), "Encoding": df.attrs.get("encoding", "")}
+
+
+def load_input_files(input_files, workers=1, report=None, **read_options):
+    """
+    input_files: list of pathlib.Path objects
+    workers: parse files in this many processes (results keep file order)
+    report: optional list, receives one file_report() dict per file
+    read_options: excel_engine / usecols / sheet_name / dtype, see read_input_file
+    returns: raw concatenated DataFrame with a __source_file column
+    """
+
+    input_files = list(input_files)
+    read = functools.partial(read_input_file, **read_options)
+
+    if workers > 1 and len(input_files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            dfs = list(pool.map(read, input_files))
+    else:
+        dfs = [read(file) for file in input_files]
+
+    if report is not None:
+        report.extend(file_report(file, df) for file, df in zip(input_files, dfs))
+
+    return pd.concat(dfs, ignore_index=True)
+
 
-        df["__source_file"] = file.name
-        dfs.append(df)
+# canonical columns clean_frame applies a cleaner to
+CLEANED_COLUMNS = ("Name", "City", "State", "School/College", "Phone Number", "Email ID")
 
-    raw_df = pd.concat(dfs, ignore_index=True)
+# cleaners that are a no-op on their own output, so an already cleaned
+# column can skip them. City, school and phone are not: a second pass
+# still changes some values (e.g. "0091..." numbers, "Ahmdabad") and is
+# kept so results do not change.
+STABLE_CLEANERS = ("Name", "State", "Email ID")
+
+
+def detect_columns(columns):
+    """
+    columns: header of the (combined) input
+    returns: {original column: canonical name} rename map
+    """
+    return COLUMN_RESOLVER.rename_map(columns)
+
+
+def prune_columns(input_files, keep=(), **read_options):
+    """
+    Header-only pre-pass: reads just the header row of each file and
+    resolves COLUMN_ALIASES against the combined header.
+    keep: other columns to parse as well (when present)
+    returns: columns to pass as usecols - the detected source columns, so
+             unmapped free-text columns are never parsed
+    """
+    columns = combined_columns(read_header(file, **read_options) for file in input_files)
+    columns.remove("__source_file")
+
+    detected_cols = detect_columns(pd.Index(columns))
+    return [col for col in columns if col in detected_cols or col in keep]
+
+
+def pruned_read_options(input_files, read_options, keep=()):
+    """read_options that parse only the needed columns, all as text."""
+    usecols = prune_columns(input_files, keep=keep, **read_options)
+    return dict(read_options, usecols=usecols, dtype=str)
+
+
+def clean_frame(raw_df, cache=None, detected_cols=None):
+    """
+    Column detection, renaming and cleaning of an already loaded frame.
+    cache: optional CleanCache shared across files / frames in one run
+    detected_cols: optional rename map computed up front (e.g. from the
+                   headers of all files when cleaning chunk by chunk)
+    returns: cleaned pandas DataFrame (not deduplicated)
+
+    Provenance: df.attrs["cleaned"] maps a column to the canonical cleaner
+    already applied to it ({"Town": "City", ...}). Columns whose cleaner
+    matches their detected name and is in STABLE_CLEANERS are not cleaned
+    again; the result carries the updated map.
+    """
+
+    if cache is None:
+        cache = CleanCache()
 
     # -----------------------------
     # COLUMN DETECTION & RENAMING
     # -----------------------------
-    detected_cols = {}
-    for canonical, aliases in COLUMN_ALIASES.items():
-        found = find_column(raw_df.columns, aliases)
-        if found:
-            detected_cols[found] = canonical
+    if detected_cols is None:
+        detected_cols = detect_columns(raw_df.columns)
+
+    cleaned = {
+        detected_cols.get(col, col): kind
+        for col, kind in raw_df.attrs.get("cleaned", {}).items()
+    }
 
     raw_df = raw_df.rename(columns=detected_cols)
 
+    def needs_cleaning(col, flag=None):
+        if col not in raw_df.columns:
+            return False
+        if cleaned.get(col) != col or col not in STABLE_CLEANERS:
+            return True
+        # email flags are produced together with the column
+        return flag is not None and flag not in raw_df.columns
+
     # -----------------------------
     # CLEANING
     # -----------------------------
-    if "Name" in raw_df.columns:
-        raw_df["Name"] = raw_df["Name"].apply(normalize_text)
+    if needs_cleaning("Name"):
+        raw_df["Name"] = clean_column(raw_df["Name"], normalize_text, cache=cache)
     
-    if "City" in raw_df.columns:
-        raw_df["City"] = raw_df["City"].apply(normalize_text)
-        raw_df["City"] = raw_df["City"].apply(standardize_city)
+    if needs_cleaning("City"):
+        raw_df["City"] = clean_column(
+            raw_df["City"], normalize_text, standardize_city, cache=cache
+        )
     
-    if "State" in raw_df.columns:
-        raw_df["State"] = raw_df["State"].apply(normalize_text)
-        raw_df["State"] = raw_df["State"].apply(standardize_state)
-
-    if "School/College" in raw_df.columns:
-        raw_df["School/College"] = raw_df["School/College"].apply(standardize_school_name)
-        raw_df["School/College"] = raw_df["School/College"].apply(drop_trailing_location)
+    if needs_cleaning("State"):
+        raw_df["State"] = clean_column(
+            raw_df["State"], normalize_text, standardize_state, cache=cache
+        )
 
-    if "Phone Number" in raw_df.columns:
-        raw_df[["Phone Number", "Phone_Valid"]] = raw_df["Phone Number"].apply(
-            lambda x: pd.Series(clean_phone(x))
+    if needs_cleaning("School/College"):
+        raw_df["School/College"] = clean_column(
+            raw_df["School/College"], standardize_school_name, drop_trailing_location, cache=cache
         )
 
-    if "Email ID" in raw_df.columns:
-        raw_df[["Email ID", "Email_Valid"]] = raw_df["Email ID"].apply(
-            lambda x: pd.Series(clean_email(x))
+    if needs_cleaning("Phone Number", "Phone_Valid"):
+        raw_df["Phone Number"], raw_df["Phone_Valid"] = clean_phone_series(raw_df["Phone Number"])
+
+    if needs_cleaning("Email ID", "Email_Valid"):
+        raw_df["Email ID"], raw_df["Email_Valid"] = clean_email_series(raw_df["Email ID"])
+
+    for col in CLEANED_COLUMNS:
+        if col in raw_df.columns:
+            cleaned[col] = col
+
+    raw_df.attrs["cleaned"] = {col: kind for col, kind in cleaned.items() if col in raw_df.columns}
+    return raw_df
+
+
+# ---------------------------------------------
+# CATEGORICAL COLUMNS
+# ---------------------------------------------
+
+# low-cardinality cleaned columns kept as pandas categoricals
+CATEGORICAL_COLUMNS = (
+    "City", "State", "Board", "Source of Data", "Stakeholder Category", "Phone_Valid", "Email_Valid",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def category_seeds():
+    """
+    Known category values per column, in the form the cleaners output, so
+    frames from different runs share most of their categories.
+    """
+    return {
+        "State": tuple(sorted(state.title() for state in VALID_STATES)),
+        "City": tuple(sorted({standardize_city(city) for city in MULTI_WORD_CITIES})),
+        "Phone_Valid": ("Yes", "No"),
+        "Email_Valid": ("Yes", "No", ""),
+    }
+
+
+def to_categorical(df, columns=CATEGORICAL_COLUMNS):
+    """
+    Converts the listed columns (when present) to categoricals: seeded
+    categories first, then values seen in the column. Values and missing
+    values are unchanged. Modifies and returns df.
+    """
+    seeds = category_seeds()
+
+    for col in columns:
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+
+        codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+        seeded = seeds.get(col, ())
+        position = {value: i for i, value in enumerate(seeded)}
+
+        extra = [value for value in uniques if value not in position]
+        position.update((value, len(seeded) + i) for i, value in enumerate(extra))
+
+        # remap factorize codes to category positions; -1 (missing) stays
+        remap = np.array([position[value] for value in uniques] + [-1], dtype=np.int64)
+        df[col] = pd.Categorical.from_codes(
+            remap[codes], categories=pd.Index(list(seeded) + extra, dtype=object)
         )
 
-    clean_df = raw_df.drop_duplicates()
+    return df
 
-    return clean_df
+
+# ---------------------------------------------
+# DEDUPLICATION
+# ---------------------------------------------
+
+DEDUP_POLICIES = ("first", "last", "latest", "most_complete")
+
+
+def _row_hashes(df):
+    """
+    uint64 hash per row. Numeric columns are promoted to float and all
+    columns hashed as objects, so chunk-level dtype inference (int vs
+    float, all-NaN columns) does not change the hash of equal rows.
+    """
+    normalized = {}
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # hashed per category and mapped through the codes; same hash
+            # as the object values
+            normalized[col] = s
+            continue
+        if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+            s = s.astype("float64")
+        normalized[col] = s.astype(object)
+    return pd.util.hash_pandas_object(
+        pd.DataFrame(normalized, index=df.index), index=False
+    ).to_numpy()
+
+
+def _blank(df):
+    return (df.isna() | df.astype(str).apply(lambda s: s.str.strip().eq(""))).to_numpy()
+
+
+def dedup_hashes(df, keys=None):
+    """
+    uint64 duplicate key per row.
+    keys=None: the whole row except __source_file, so the same record
+               coming from two files is a duplicate
+    keys: e.g. ["Phone Number"] or ["Phone Number", "Email ID"] (cleaned
+          columns); rows where every key is blank fall back to the whole row
+    """
+    row_cols = [col for col in df.columns if col != "__source_file"]
+
+    keys = [col for col in (keys or []) if col in df.columns]
+    if not keys:
+        return _row_hashes(df[row_cols])
+
+    hashes = _row_hashes(df[keys]).copy()
+
+    no_key = _blank(df[keys]).all(axis=1)
+    if no_key.any():
+        hashes[no_key] = _row_hashes(df.loc[no_key, row_cols])
+    return hashes
+
+
+def _date_stamps(series):
+    """
+    Timestamps of a date column for ordering, read like normalize_date_series:
+    strings in the column's inferred format (so dd/mm columns stay day-first),
+    the rest with the row-wise mixed parse. Only used for ordering, so mixed
+    UTC offsets are compared in UTC; time of day is kept to break ties.
+    returns: datetime64[ns, UTC] Series, NaT where unparseable
+    """
+    dates = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns, UTC]")
+
+    is_text = series.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    text = series[is_text].astype(object).str.strip()
+
+    fmt = infer_date_format(text[text.ne("")].unique())
+    if fmt is not None:
+        try:
+            dates[is_text] = pd.to_datetime(text, format=fmt, errors="coerce", utc=True)
+        except (ValueError, TypeError):
+            pass
+
+    rest = dates.isna() & series.notna()
+    if rest.any():
+        dates[rest] = pd.to_datetime(series[rest], errors="coerce", format="mixed", utc=True)
+    return dates
 
 
-def run_cleaning_pipeline2(df):
+def deduplicate(df, keys=None, policy="first", date_column=None):
+    """
+    df: cleaned pandas DataFrame
+    keys: duplicate key columns, see dedup_hashes
+    policy: which row of a duplicate group survives
+            "first" / "last"  - by position
+            "latest"          - newest date_column value (unparseable dates lose)
+            "most_complete"   - most non-blank cells
+            ties keep the earlier row; survivors keep their original order
+    returns: deduplicated DataFrame
+    """
+    if policy not in DEDUP_POLICIES:
+        raise ValueError(f"Unknown dedup policy: {policy}")
+
+    hashes = dedup_hashes(df, keys)
+    order = np.arange(len(df))
+
+    if policy == "last":
+        order = order[::-1]
+    elif policy == "latest":
+        if date_column not in df.columns:
+            raise ValueError("policy='latest' needs an existing date_column")
+        dates = _date_stamps(df[date_column])
+        # newest first, NaT last; stable so ties keep position order
+        stamp = dates.to_numpy(dtype="datetime64[ns]").astype("int64")
+        stamp = np.where(dates.isna().to_numpy(), np.iinfo("int64").min, stamp)
+        order = np.argsort(-stamp.astype("float64"), kind="stable")
+    elif policy == "most_complete":
+        filled = (~_blank(df)).sum(axis=1)
+        order = np.argsort(-filled, kind="stable")
+
+    first = ~pd.Series(hashes[order]).duplicated().to_numpy()
+    return df.iloc[np.sort(order[first])]
+
+
+def check_dedup_columns(columns, dedup=None):
+    """
+    columns: cleaned column names
+    dedup: deduplicate() options
+    Raises ValueError when a key or the date column is not among columns:
+    dedup_hashes would silently drop the key and fall back to whole rows.
+    """
+    dedup = dedup or {}
+    wanted = list(dedup.get("keys") or [])
+    if dedup.get("date_column"):
+        wanted.append(dedup["date_column"])
+
+    missing = [col for col in wanted if col not in columns]
+    if missing:
+        available = ", ".join(str(col) for col in columns if col != "__source_file")
+        raise ValueError(f"Unknown dedup column(s): {', '.join(missing)}. Cleaned columns: {available}")
+
+
+# ---------------------------------------------
+# STREAMLIT ENTRY POINT (DO NOT MODIFY LOGIC)
+# ---------------------------------------------
+
+def run_cleaning_pipeline(input_files, cache=None, workers=1, parallel_clean=False, report=None, dedup=None,
+                          categorical=True, prune=False, **read_options):
     """
     input_files: list of pathlib.Path objects
+    cache: optional CleanCache to share cleaned values with other runs
+    workers: number of processes used to load (and optionally clean) files
+    parallel_clean: also clean each file inside the worker processes
+    report: optional list, receives per-file rows / encoding
+    dedup: optional deduplicate() options, e.g. {"keys": ["Phone Number"], "policy": "latest",
+           "date_column": "Timestamp"}; default drops whole-row duplicates
+    categorical: return CATEGORICAL_COLUMNS as pandas categoricals
+    prune: parse only the columns COLUMN_ALIASES detects (header pre-pass),
+           as text; other columns are dropped from the result
+    read_options: excel_engine / usecols / sheet_name / dtype, see read_input_file
     returns: cleaned pandas DataFrame
     """
 
-    raw_df = df.copy()
+    if prune:
+        # a "latest" dedup still needs its date column
+        read_options = pruned_read_options(input_files, read_options, keep=[(dedup or {}).get("date_column")])
 
-    # -----------------------------
-    # COLUMN DETECTION & RENAMING
-    # -----------------------------
-    detected_cols = {}
-    for canonical, aliases in COLUMN_ALIASES.items():
-        found = find_column(raw_df.columns, aliases)
-        if found:
-            detected_cols[found] = canonical
+    if parallel_clean and workers > 1:
+        raw_df = clean_files_parallel(input_files, workers, cache=cache, report=report, **read_options)
+    else:
+        raw_df = load_input_files(input_files, workers=workers, report=report, **read_options)
+        raw_df = clean_frame(raw_df, cache=cache)
 
-    raw_df = raw_df.rename(columns=detected_cols)
+    if categorical:
+        raw_df = to_categorical(raw_df)
 
-    # -----------------------------
-    # CLEANING
-    # -----------------------------
-    if "Name" in raw_df.columns:
-        raw_df["Name"] = raw_df["Name"].apply(normalize_text)
-    
-    if "City" in raw_df.columns:
-        raw_df["City"] = raw_df["City"].apply(normalize_text)
-        raw_df["City"] = raw_df["City"].apply(standardize_city)
-    
-    if "State" in raw_df.columns:
-        raw_df["State"] = raw_df["State"].apply(normalize_text)
-        raw_df["State"] = raw_df["State"].apply(standardize_state)
+    clean_df = deduplicate(raw_df, **(dedup or {}))
 
-    if "School/College" in raw_df.columns:
-        raw_df["School/College"] = raw_df["School/College"].apply(standardize_school_name)
-        raw_df["School/College"] = raw_df["School/College"].apply(drop_trailing_location)
+    return clean_df
 
-    if "Phone Number" in raw_df.columns:
-        raw_df[["Phone Number", "Phone_Valid"]] = raw_df["Phone Number"].apply(
-            lambda x: pd.Series(clean_phone(x))
-        )
 
-    if "Email ID" in raw_df.columns:
-        raw_df[["Email ID", "Email_Valid"]] = raw_df["Email ID"].apply(
-            lambda x: pd.Series(clean_email(x))
-        )
+def run_cleaning_pipeline2(df, cache=None, dedup=None, categorical=True):
+    """
+    df: already mapped pandas DataFrame (final dataset)
+    cache: optional CleanCache to share cleaned values with other runs
+    dedup: optional deduplicate() options (key columns use the cleaned
+           names, e.g. "Phone Number" / "Email ID")
+    categorical: return CATEGORICAL_COLUMNS as pandas categoricals
+    returns: cleaned pandas DataFrame
+    """
+
+    raw_df = clean_frame(df.copy(), cache=cache)
 
-    clean_df = raw_df.drop_duplicates()
+    if categorical:
+        raw_df = to_categorical(raw_df)
+
+    clean_df = deduplicate(raw_df, **(dedup or {}))
 
     return clean_df
 
 
-# -----------------------------
-# DEDUPLICATION
-# -----------------------------
-clean_df = raw_df.drop_duplicates()
+# ---------------------------------------------
+# STREAMING PIPELINE (INPUTS LARGER THAN RAM)
+# ---------------------------------------------
 
-# -----------------------------
-# OUTPUTS
-# -----------------------------
-clean_df.to_csv(f"{OUTPUT_FOLDER}/reviews_cleaned.csv", index=False)
+def read_header(file, excel_engine=EXCEL_ENGINE, usecols=None, sheet_name=0, dtype=None, encoding=None):
+    """Column names of a file, parsing only its header row (dtype is unused)."""
+    if is_csv(file):
+        if encoding is None:
+            encoding = sniff_encoding(file)
+        return pd.read_csv(file, encoding=encoding, nrows=0, usecols=_usecols(usecols)).columns
+    return read_excel(file, excel_engine=excel_engine, usecols=usecols, sheet_name=sheet_name, nrows=0).columns
 
-summary_df = pd.DataFrame(
-    {
-        "Original Rows": [original_count],
-        "Rows After Deduplication": [len(clean_df)]
-    }
+
+def combined_columns(headers):
+    """
+    headers: per-file column lists
+    returns: column order pd.concat gives the loaded frames (each with
+             __source_file appended)
+    """
+    columns = []
+    seen = set()
+    for header in headers:
+        for col in list(header) + ["__source_file"]:
+            if col not in seen:
+                seen.add(col)
+                columns.append(col)
+    return columns
+
+
+def cleaned_columns(columns, detected_cols):
+    """
+    columns: combined header (see combined_columns)
+    returns: column names clean_frame gives a frame with that header
+    """
+    return list(clean_frame(pd.DataFrame(columns=columns), detected_cols=detected_cols).columns)
+
+
+def output_columns(input_files, prune=False, keep=(), **read_options):
+    """
+    Header-only pass: the cleaned column names a run over input_files
+    produces (prune / keep as in pruned_read_options).
+    """
+    if prune:
+        read_options = pruned_read_options(input_files, read_options, keep=keep)
+
+    columns = combined_columns(read_header(file, **read_options) for file in input_files)
+    return cleaned_columns(columns, detect_columns(pd.Index(columns)))
+
+
+def iter_file_chunks(file, chunksize=STREAM_CHUNKSIZE, excel_engine=EXCEL_ENGINE, usecols=None, sheet_name=0,
+                     dtype=None, encoding=None):
+    if is_csv(file):
+        # Chunks cannot be re-read once emitted, so the encoding is decided
+        # on the whole file (a byte scan, no parsing) unless given
+        if encoding is None:
+            encoding = sniff_encoding(file, sample_size=None)
+
+        # Read as text: per-chunk dtype inference would otherwise parse the
+        # same column as int in one chunk and float (or text) in the next
+        with pd.read_csv(
+            file, encoding=encoding, chunksize=chunksize, dtype=str, usecols=_usecols(usecols)
+        ) as reader:
+            yield from reader
+    else:
+        # Excel cannot be parsed incrementally; only the cleaning is chunked
+        if dtype is None:
+            df = read_excel_identifiers(file, excel_engine=excel_engine, usecols=usecols, sheet_name=sheet_name)
+        else:
+            df = read_excel(file, excel_engine=excel_engine, usecols=usecols, sheet_name=sheet_name, dtype=dtype)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+
+# format: (mime type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "csv.gz": ("application/gzip", ".csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+# low-cardinality columns stored dictionary-encoded in Parquet output
+DICTIONARY_COLUMNS = (
+    "City", "State", "Board", "Source of Data", "Stakeholder Category",
+    "Phone_Valid", "Email_Valid", "__source_file",
 )
-summary_df.to_excel(f"{OUTPUT_FOLDER}/data_quality_summary.xlsx", index=False)
 
-print("Phase 1 cleaning completed successfully.")
 
+def output_format(path):
+    """csv / csv.gz / parquet from the file name."""
+    name = Path(path).name.lower()
+    if name.endswith((".parquet", ".pq")):
+        return "parquet"
+    if name.endswith(".gz"):
+        return "csv.gz"
+    return "csv"
 
 
-if __name__ == "__main__":
-    # -----------------------------
-    # LOAD FILES
-    # -----------------------------
-    dfs = []
-    files = list(Path(INPUT_FOLDER).glob("*.xls*")) + list(Path(INPUT_FOLDER).glob("*.csv"))
+class ChunkWriter:
+    """
+    Incremental CSV / gzip CSV / Parquet writer.
+    output: file path (format from its suffix, see output_format) or an
+            open binary file object, which is left open (fmt required)
+    Parquet columns are written as strings so every chunk shares one schema
+    (no float coercion of mobile numbers); DICTIONARY_COLUMNS are
+    dictionary-encoded.
+    """
+
+    def __init__(self, output, fmt=None):
+        if isinstance(output, (str, os.PathLike)):
+            self.output_path = Path(output)
+            self._target = None
+        else:
+            self.output_path = None
+            self._target = output
+
+        self.fmt = fmt or output_format(self.output_path)
+        if self.fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown output format: {self.fmt}")
+
+        self.rows = 0
+        self._writer = None
+        self._file = None
+        self._handle = None
+        self._started = False
+
+    def _open(self):
+        # opened on the first write: nothing is created for an empty run
+        if self._target is None:
+            self._file = open(self.output_path, "wb")
+            target = self._file
+        else:
+            target = self._target
+
+        if self.fmt == "csv.gz":
+            self._handle = gzip.GzipFile(fileobj=target, mode="wb")
+        else:
+            self._handle = target
+
+    def write(self, df):
+        if self._handle is None:
+            self._open()
+
+        if self.fmt == "parquet":
+            self._write_parquet(df)
+        else:
+            df.to_csv(self._handle, index=False, header=not self._started, encoding="utf-8")
+        self._started = True
+        self.rows += len(df)
+
+    def _write_parquet(self, df):
+        pa, pq = _require_pyarrow()
+        text_df = pd.DataFrame({col: df[col].astype("string") for col in df.columns})
+        table = pa.Table.from_pandas(text_df, preserve_index=False)
+        if self._writer is None:
+            dictionary = [col for col in table.column_names if col in DICTIONARY_COLUMNS]
+            self._writer = pq.ParquetWriter(self._handle, table.schema, use_dictionary=dictionary)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._handle is not None and self._handle is not self._target and self._handle is not self._file:
+            # gzip wrapper: writes the trailer, leaves the underlying file open
+            self._handle.close()
+        self._handle = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_cleaning_pipeline_streaming(input_files, output_path, chunksize=STREAM_CHUNKSIZE, cache=None, report=None,
+                                    dedup_keys=None, prune=False, progress=None, **read_options):
+    """
+    Chunked version of run_cleaning_pipeline for inputs larger than RAM.
+    CSVs are read chunksize rows at a time, each chunk is cleaned and
+    written to output_path (CSV or Parquet), and duplicates are dropped
+    across chunks through a set of row hashes. Column detection runs once
+    on the combined headers, so the output matches run_cleaning_pipeline.
+
+    input_files: list of pathlib.Path objects
+    report: optional list, receives per-file rows / encoding
+    dedup_keys: duplicate key columns, see dedup_hashes (the first row of
+                a group is kept: earlier chunks are already written)
+    prune: parse only the detected columns, see run_cleaning_pipeline
+    progress: optional StageTimer, receives one stage per input file
+    read_options: excel_engine / usecols / sheet_name / dtype, see read_input_file
+    returns: {"rows_in": ..., "rows_out": ...}
+    """
+
+    if cache is None:
+        cache = CleanCache()
+
+    if prune:
+        read_options = pruned_read_options(input_files, read_options)
+
+    columns = combined_columns(read_header(file, **read_options) for file in input_files)
+    detected_cols = detect_columns(pd.Index(columns))
+    check_dedup_columns(cleaned_columns(columns, detected_cols), {"keys": dedup_keys})
+
+    seen = set()
+    rows_in = 0
+
+    with ChunkWriter(output_path) as writer:
+        for file in input_files:
+            encoding = sniff_encoding(file, sample_size=None) if is_csv(file) else "excel"
+            file_rows = 0
+
+            for chunk in iter_file_chunks(file, chunksize, encoding=encoding, **read_options):
+                rows_in += len(chunk)
+                file_rows += len(chunk)
+
+                chunk = chunk.copy()
+                chunk["__source_file"] = file.name
+                chunk = chunk.reindex(columns=columns)
+
+                cleaned = clean_frame(chunk, cache=cache, detected_cols=detected_cols)
+
+                hashes = dedup_hashes(cleaned, dedup_keys)
+                keep = ~pd.Series(hashes).duplicated().to_numpy()
+                keep &= np.fromiter((h not in seen for h in hashes), dtype=bool, count=len(hashes))
+                seen.update(hashes[keep].tolist())
+
+                writer.write(cleaned[keep])
+
+            if report is not None:
+                report.append({"File": file.name, "Rows": file_rows, "Encoding": encoding})
+            if progress is not None:
+                progress.lap(f"stream {file.name}", file_rows)
+
+    return {"rows_in": rows_in, "rows_out": writer.rows}
+
+
+# ---------------------------------------------
+# EXPORT (DOWNLOADS)
+# ---------------------------------------------
+
+def write_frame(df, output, fmt=None, chunksize=EXPORT_CHUNKSIZE):
+    """
+    Writes df chunk by chunk through ChunkWriter.
+    output / fmt: see ChunkWriter
+    """
+    with ChunkWriter(output, fmt) as writer:
+        # at least one (possibly empty) chunk, so the header is written
+        for start in range(0, max(len(df), 1), chunksize):
+            writer.write(df.iloc[start:start + chunksize])
+
+
+def export_frame(df, fmt="csv", chunksize=EXPORT_CHUNKSIZE, spool_size=EXPORT_SPOOL_SIZE):
+    """
+    Serializes df chunk by chunk instead of building one in-memory string.
+    fmt: "csv", "csv.gz" or "parquet" (see EXPORT_FORMATS)
+    spool_size: output kept in memory up to this size, then moved to a
+                temporary file on disk
+    returns: SpooledTemporaryFile positioned at the start (close it when done)
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_size)
+    try:
+        write_frame(df, spool, fmt, chunksize=chunksize)
+    except BaseException:
+        spool.close()
+        raise
+
+    spool.seek(0)
+    return spool
+
+
+def read_cleaned(path, columns=None):
+    """
+    Reads a cleaned output back with every column as text.
+    columns: only load these (Parquet reads just those column chunks)
+    """
+    if output_format(path) == "parquet":
+        _require_pyarrow()
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, dtype=str, usecols=columns)
+
+
+# ---------------------------------------------
+# PARALLEL LOADING & CLEANING
+# ---------------------------------------------
+
+_WORKER_CACHE = None
+
+
+def shard_columns(columns, detected_cols):
+    """
+    Columns a file is cleaned with on its own: its own columns plus the
+    detected source columns it lacks. Those are cleaned as empty (e.g.
+    Phone_Valid "No"), exactly as in a run over the combined frame.
+    """
+    columns = list(columns)
+    return columns + [col for col in detected_cols if col not in columns]
+
+
+def _clean_file(file, columns, detected_cols, read_options):
+    """
+    Worker task: load one file, align it to the combined columns (or to
+    shard_columns when columns is None) and clean it with a cache kept for
+    the lifetime of the worker process.
+    returns: (cleaned DataFrame, cache hits, cache misses, file_report)
+    """
+    global _WORKER_CACHE
+    if _WORKER_CACHE is None:
+        _WORKER_CACHE = CleanCache()
+
+    cache = _WORKER_CACHE
+    hits, misses = cache.hits, cache.misses
+
+    raw_df = read_input_file(file, **read_options)
+    if columns is None:
+        columns = shard_columns(raw_df.columns, detected_cols)
+    df = clean_frame(raw_df.reindex(columns=columns), cache=cache, detected_cols=detected_cols)
+
+    return df, cache.hits - hits, cache.misses - misses, file_report(file, raw_df)
+
+
+def clean_files_parallel(input_files, workers, cache=None, report=None, **read_options):
+    """
+    Loads and cleans every file in its own worker process, then merges the
+    results in input order. Column detection runs once on the combined
+    headers so every worker renames the same way.
+    returns: cleaned, concatenated DataFrame (not deduplicated)
+    """
+
+    input_files = list(input_files)
+
+    columns = combined_columns(read_header(file, **read_options) for file in input_files)
+    detected_cols = detect_columns(pd.Index(columns))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            _clean_file, input_files, repeat(columns), repeat(detected_cols), repeat(read_options)
+        ))
+
+    if cache is not None:
+        for _, hits, misses, _ in results:
+            cache.hits += hits
+            cache.misses += misses
+
+    if report is not None:
+        report.extend(info for _, _, _, info in results)
+
+    df = pd.concat([df for df, _, _, _ in results], ignore_index=True)
+    # every file was cleaned against the same combined columns
+    df.attrs["cleaned"] = results[0][0].attrs.get("cleaned", {}) if results else {}
+    return df
+
+
+# ---------------------------------------------
+# INCREMENTAL RUNS (PER-FILE SHARD CACHE)
+# ---------------------------------------------
+
+def file_sha256(file, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file, "rb") as fp:
+        for block in iter(lambda: fp.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _code_version():
+    """Hash of this module: edited cleaning rules invalidate every shard."""
+    return file_sha256(__file__)
+
+
+def shard_signature(detected_cols, read_options):
+    """
+    Everything a shard's content depends on besides its own file: the
+    rename map of the combined header, the read options, the cleaning
+    code and the pandas / numpy versions the shards are pickled with.
+    New files with extra or reordered columns leave it unchanged.
+    """
+    state = [sorted([str(col), canonical] for col, canonical in detected_cols.items()),
+             repr(sorted(read_options.items())), _code_version(), pd.__version__, np.__version__]
+    return hashlib.sha256(json.dumps(state).encode()).hexdigest()
+
+
+class ShardCache:
+    """
+    Manifest of input files - path, size, mtime and sha256 - with one
+    pickled cleaned DataFrame (shard) per file, kept in folder.
+
+    A file counts as unchanged when its size and mtime match the manifest,
+    or when only the mtime moved and the sha256 still matches. Shards are
+    valid only for the signature they were written under (see
+    shard_signature); a different signature makes every shard stale.
+    """
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.folder / "manifest.json"
+
+        manifest = {}
+        if self.manifest_path.exists():
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+
+        self.signature = manifest.get("signature")
+        self.files = manifest.get("files", {})
+
+    @staticmethod
+    def _key(file):
+        return str(Path(file).resolve())
+
+    def entry(self, file):
+        """
+        returns: manifest entry of file ({"size", "mtime", "sha256",
+                 "columns", "shard", "report"}) if its content is unchanged,
+                 else None
+        """
+        entry = self.files.get(self._key(file))
+        if entry is None:
+            return None
+
+        stat = file.stat()
+        if stat.st_size != entry["size"]:
+            return None
+        if stat.st_mtime_ns != entry["mtime"]:
+            if file_sha256(file) != entry["sha256"]:
+                return None
+            # touched or copied over, same content
+            entry["mtime"] = stat.st_mtime_ns
+
+        return entry
+
+    def get(self, file, signature):
+        """returns: (cleaned shard, file_report) or None when stale"""
+        entry = self.entry(file)
+        if entry is None or signature != self.signature:
+            return None
+
+        path = self.folder / entry["shard"]
+        if not path.exists():
+            return None
+        try:
+            shard = pd.read_pickle(path)
+        except Exception:
+            # unreadable (truncated, or pickled by another pandas): re-clean
+            return None
+        return shard, entry["report"]
+
+    def put(self, file, df, info, columns):
+        """Stores the cleaned shard of file and its manifest entry."""
+        key = self._key(file)
+        stat = file.stat()
+        shard = hashlib.sha256(key.encode()).hexdigest()[:32] + ".pkl"
+
+        columns = list(columns)
+        if not all(isinstance(col, (str, int)) for col in columns):
+            # e.g. date headers in Excel do not survive JSON: re-read each run
+            columns = None
+
+        df.to_pickle(self.folder / shard)
+        self.files[key] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "sha256": file_sha256(file),
+            "columns": columns,
+            "shard": shard,
+            "report": info,
+        }
+
+    def retain(self, input_files):
+        """Drops manifest entries and shards of files no longer in input_files."""
+        keep = {self._key(file) for file in input_files}
+        for key in [key for key in self.files if key not in keep]:
+            (self.folder / self.files.pop(key)["shard"]).unlink(missing_ok=True)
+
+    def save(self, signature):
+        self.signature = signature
+        manifest = {"signature": signature, "files": self.files}
+
+        fd, tmp = tempfile.mkstemp(dir=self.folder, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as fp:
+            json.dump(manifest, fp)
+        os.replace(tmp, self.manifest_path)
+
+
+def clean_files_incremental(input_files, shards, workers=1, cache=None, report=None, **read_options):
+    """
+    Cleans only new or changed files (or all of them when the rename map
+    changed) and takes the others from their cached shards. Each shard
+    keeps its own columns (see shard_columns); the concatenation is
+    reindexed to the combined column order, so the result matches a full
+    run.
+    shards: ShardCache
+    returns: (cleaned, concatenated DataFrame (not deduplicated),
+              number of files cleaned in this run)
+    """
+
+    input_files = list(input_files)
+    shards.retain(input_files)
+
+    # unchanged files reuse their stored header
+    headers = []
+    for file in input_files:
+        entry = shards.entry(file)
+        if entry is not None and entry["columns"] is not None:
+            headers.append(entry["columns"])
+        else:
+            headers.append(read_header(file, **read_options))
+
+    columns = combined_columns(headers)
+    detected_cols = detect_columns(pd.Index(columns))
+    signature = shard_signature(detected_cols, read_options)
+
+    results = [shards.get(file, signature) for file in input_files]
+    stale = [i for i, result in enumerate(results) if result is None]
+
+    if workers > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            cleaned = pool.map(
+                _clean_file, [input_files[i] for i in stale],
+                repeat(None), repeat(detected_cols), repeat(read_options)
+            )
+            for i, (df, hits, misses, info) in zip(stale, cleaned):
+                if cache is not None:
+                    cache.hits += hits
+                    cache.misses += misses
+                results[i] = df, info
+    else:
+        for i in stale:
+            raw_df = read_input_file(input_files[i], **read_options)
+            raw_df = raw_df.reindex(columns=shard_columns(raw_df.columns, detected_cols))
+            df = clean_frame(raw_df, cache=cache, detected_cols=detected_cols)
+            results[i] = df, file_report(input_files[i], raw_df)
+
+    for i in stale:
+        shards.put(input_files[i], *results[i], headers[i])
+    shards.save(signature)
+
+    if report is not None:
+        report.extend(info for _, info in results)
+
+    # column order and provenance of a run over the combined frame
+    layout = clean_frame(pd.DataFrame(columns=columns), detected_cols=detected_cols)
+
+    df = pd.concat([df for df, _ in results], ignore_index=True).reindex(columns=layout.columns)
+    df.attrs["cleaned"] = layout.attrs["cleaned"]
+    return df, len(stale)
+
+
+# ---------------------------------------------
+# PROGRESS REPORTING
+# ---------------------------------------------
+
+class StageTimer:
+    """
+    Wall time and throughput of the stages of a batch run. lap() closes
+    the stage that started at the previous lap (or at creation).
+    verbose: print each stage as it finishes
+    """
+
+    def __init__(self, verbose=True):
+        self.verbose = verbose
+        self.stages = []
+        self.start = time.perf_counter()
+
+    def lap(self, stage, rows):
+        now = time.perf_counter()
+        seconds = now - self.start
+        self.start = now
+
+        rate = rows / seconds if seconds > 0 else 0.0
+        self.stages.append({"Stage": stage, "Rows": rows, "Seconds": round(seconds, 3), "Rows/s": round(rate)})
+
+        if self.verbose:
+            print(f"{stage:<24} {rows:>12,} rows {seconds:9.2f}s {rate:14,.0f} rows/s", flush=True)
+
+
+# ---------------------------------------------
+# PHASE 1 BATCH RUN
+# ---------------------------------------------
+
+INPUT_SUFFIXES = (".csv", ".xls", ".xlsx", ".xlsm", ".xlsb")
+
+
+def list_input_files(input_folder=INPUT_FOLDER):
+    return list(Path(input_folder).glob("*.xls*")) + list(Path(input_folder).glob("*.csv"))
+
+
+def expand_inputs(patterns):
+    """
+    patterns: file paths, glob patterns (e.g. "drops/2024-*/*.csv") or
+              folders (all CSV / Excel files in them)
+    returns: list of pathlib.Path, in pattern order, without duplicates
+    """
+    files = []
+    seen = set()
+
+    for pattern in patterns:
+        if Path(pattern).is_dir():
+            matches = list_input_files(pattern)
+        else:
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=True))
+
+        for file in matches:
+            if file.suffix.lower() in INPUT_SUFFIXES and file.is_file() and file.resolve() not in seen:
+                seen.add(file.resolve())
+                files.append(file)
+
+    return files
+
+
+def run_phase1(input_folder=INPUT_FOLDER, output_folder=OUTPUT_FOLDER, chunksize=None, workers=1, dedup=None,
+               output_format=OUTPUT_FORMAT, prune=False, incremental=False, input_files=None, progress=None):
+    """
+    Cleans every CSV / Excel file in input_folder and writes
+    reviews_cleaned.<csv|csv.gz|parquet> plus data_quality_summary.xlsx
+    to output_folder.
+    chunksize: stream the inputs in chunks of this many rows (bounded
+               memory) instead of loading everything at once
+    workers: load and clean files in this many processes (in-memory mode)
+    dedup: optional deduplicate() options (streaming only uses "keys")
+    output_format: "csv", "csv.gz" or "parquet" (see EXPORT_FORMATS)
+    prune: parse only the detected columns, see run_cleaning_pipeline
+    incremental: clean only files that are new or changed since the last
+                 incremental run, reusing the cleaned shards of the others
+                 (kept in output_folder/SHARD_FOLDER; in-memory mode only)
+    input_files: explicit list of pathlib.Path to clean instead of
+                 everything in input_folder (see expand_inputs)
+    progress: optional StageTimer; stage timings also go to a "Stages"
+              sheet of the summary
+    returns: cleaned pandas DataFrame (None when streaming)
+    """
+
+    files = list(input_files) if input_files is not None else list_input_files(input_folder)
 
     if not files:
         raise FileNotFoundError("No input files found")
 
-    for file in files:
-        try:
-            df = pd.read_csv(file, encoding="utf-8") if file.suffix == ".csv" else pd.read_excel(file)
-        except UnicodeDecodeError:
-            df = pd.read_csv(file, encoding="cp1252") if file.suffix == ".csv" else pd.read_excel(file)
+    if incremental and chunksize:
+        raise ValueError("incremental runs are not supported with chunksize (streaming)")
+
+    read_options = {}
+    if prune:
+        read_options = pruned_read_options(files, read_options, keep=[(dedup or {}).get("date_column")])
+
+    Path(output_folder).mkdir(parents=True, exist_ok=True)
+    output_path = f"{output_folder}/reviews_cleaned{EXPORT_FORMATS[output_format][1]}"
+    cache = CleanCache()
+    report = []
+
+    if chunksize:
+        clean_df = None
+        counts = run_cleaning_pipeline_streaming(
+            files, output_path, chunksize=chunksize, cache=cache, report=report,
+            dedup_keys=(dedup or {}).get("keys"), progress=progress, **read_options
+        )
+        original_count, clean_count = counts["rows_in"], counts["rows_out"]
+
+    else:
+        if incremental:
+            shards = ShardCache(Path(output_folder) / SHARD_FOLDER)
+            raw_df, cleaned_files = clean_files_incremental(
+                files, shards, workers=workers, cache=cache, report=report, **read_options
+            )
+            original_count = len(raw_df)
+            print(f"Incremental run: cleaned {cleaned_files} of {len(files)} files, "
+                  f"{len(files) - cleaned_files} from cache")
+            if progress is not None:
+                progress.lap("load + clean", original_count)
+        elif workers > 1:
+            raw_df = clean_files_parallel(files, workers, cache=cache, report=report, **read_options)
+            original_count = len(raw_df)
+            if progress is not None:
+                progress.lap("load + clean", original_count)
+        else:
+            raw_df = load_input_files(files, report=report, **read_options)
+            original_count = len(raw_df)
+            if progress is not None:
+                progress.lap("load", original_count)
+
+            raw_df = clean_frame(raw_df, cache=cache)
+            if progress is not None:
+                progress.lap("clean", original_count)
+
+        # -----------------------------
+        # DEDUPLICATION
+        # -----------------------------
+        check_dedup_columns(raw_df.columns, dedup)
+        raw_df = to_categorical(raw_df)
+        clean_df = deduplicate(raw_df, **(dedup or {}))
+        clean_count = len(clean_df)
+        if progress is not None:
+            progress.lap("deduplicate", original_count)
+
+        # -----------------------------
+        # OUTPUTS
+        # -----------------------------
+        write_frame(clean_df, output_path)
+        if progress is not None:
+            progress.lap("write", clean_count)
+
+    summary_df = pd.DataFrame(
+        {
+            "Original Rows": [original_count],
+            "Rows After Deduplication": [clean_count],
+            "Clean Cache Hit Rate": [round(cache.hit_rate, 4)]
+        }
+    )
+    files_df = pd.DataFrame(report, columns=["File", "Rows", "Encoding"])
+
+    with pd.ExcelWriter(f"{output_folder}/data_quality_summary.xlsx") as writer:
+        summary_df.to_excel(writer, sheet_name="Summary", index=False)
+        files_df.to_excel(writer, sheet_name="Files", index=False)
+        if progress is not None:
+            pd.DataFrame(progress.stages).to_excel(writer, sheet_name="Stages", index=False)
+
+    for info in report:
+        print(f"{info['File']}: {info['Rows']} rows ({info['Encoding']})")
+    print(f"Clean cache: {cache.hits} hits / {cache.misses} misses ({cache.hit_rate:.1%} hit rate)")
+    print("Phase 1 cleaning completed successfully.")
+
+    return clean_df
 
-        df["__source_file"] = file.name
-        dfs.append(df)
 
-    raw_df = pd.concat(dfs, ignore_index=True)
-    original_count = len(raw_df)
+# ---------------------------------------------
+# COMMAND LINE
+# ---------------------------------------------
+
+def main(argv=None):
+    """
+    Batch driver for cron / CI jobs, e.g.
+    python data_cleaner.py "drops/*.csv" "drops/*.xlsx" -f parquet -w 4 --dedup-key "Phone Number"
+    returns: process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="data_cleaner.py",
+        description="Phase 1 batch cleaning of CSV / Excel files.",
+    )
+    parser.add_argument("inputs", nargs="*", default=[INPUT_FOLDER],
+                        help=f"input files, glob patterns or folders (default: {INPUT_FOLDER})")
+    parser.add_argument("-o", "--output-folder", default=OUTPUT_FOLDER,
+                        help=f"output folder (default: {OUTPUT_FOLDER})")
+    parser.add_argument("-f", "--format", choices=list(EXPORT_FORMATS), default=OUTPUT_FORMAT,
+                        help=f"output format (default: {OUTPUT_FORMAT})")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="processes used to load and clean files (default: 1)")
+    parser.add_argument("-c", "--chunksize", type=int, default=None,
+                        help="stream inputs in chunks of this many rows (bounded memory)")
+    parser.add_argument("-k", "--dedup-key", action="append", dest="dedup_keys", metavar="COLUMN",
+                        help='duplicate key column, repeatable (default: whole rows), e.g. "Phone Number"')
+    parser.add_argument("--dedup-policy", choices=DEDUP_POLICIES, default="first",
+                        help="row kept per duplicate key (default: first)")
+    parser.add_argument("--date-column",
+                        help='date column used by --dedup-policy latest, e.g. "Timestamp"')
+    parser.add_argument("--prune", action="store_true",
+                        help="parse only the detected name / phone / email / school / city / state columns")
+    parser.add_argument("--incremental", action="store_true",
+                        help="clean only new or changed files, reusing cached shards of the others")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no per-stage progress lines")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.chunksize is not None and args.chunksize < 1:
+        parser.error("--chunksize must be at least 1")
+    if args.chunksize and args.dedup_policy != "first":
+        parser.error("streaming (--chunksize) only supports --dedup-policy first")
+    if args.chunksize and args.incremental:
+        parser.error("--incremental cannot be combined with --chunksize")
+    if args.dedup_policy == "latest" and not args.date_column:
+        parser.error("--dedup-policy latest needs --date-column")
+
+    files = expand_inputs(args.inputs)
+    if not files:
+        parser.error("no CSV / Excel files match " + " ".join(args.inputs))
 
-    # ---- existing logic continues unchanged ----
+    dedup = {"keys": args.dedup_keys, "policy": args.dedup_policy}
+    if args.date_column:
+        dedup["date_column"] = args.date_column
 
+    # a mistyped key would silently dedup on whole rows: check it before any work.
+    # Only the check is a usage error; a file that cannot be read is not.
+    columns = output_columns(files, prune=args.prune, keep=[args.date_column])
+    try:
+        check_dedup_columns(columns, dedup)
+    except ValueError as e:
+        parser.error(str(e))
+
+    progress = StageTimer(verbose=not args.quiet)
+    start = time.perf_counter()
+    run_phase1(
+        output_folder=args.output_folder,
+        chunksize=args.chunksize,
+        workers=args.workers,
+        dedup=dedup,
+        output_format=args.format,
+        prune=args.prune,
+        incremental=args.incremental,
+        input_files=files,
+        progress=progress,
+    )
+
+    total = time.perf_counter() - start
+
+    # input rows: the first in-memory stage, or every streamed file
+    streamed = [stage["Rows"] for stage in progress.stages if stage["Stage"].startswith("stream ")]
+    rows = sum(streamed) if streamed else progress.stages[0]["Rows"]
+    if not args.quiet and total > 0:
+        print(f"{'total':<24} {rows:>12,} rows {total:9.2f}s {rows / total:14,.0f} rows/s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from data_cleaner import clean_phone_series
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+MASTER_DB = "output_phase1/master.sqlite"
+MASTER_TABLE = "master"
+KEY_COLUMN = "__mobile_key"
+USAGE_TABLE = "__master_usage"            # last write time and row count per master table
+SESSION_PREFIX = "session-"               # generated per-session master names
+SESSION_MAX_AGE = 7 * 24 * 60 * 60        # seconds since a session master was last written
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _fold(name):
+    # SQLite matches identifiers case-insensitively, for ASCII letters only
+    return "".join(c.lower() if c.isascii() else c for c in name)
+
+
+def mobile_keys(series):
+    """
+    Normalized 10-digit mobile numbers used as the master key.
+    Invalid / missing numbers get no key (None), see row_key.
+    """
+    digits, valid = clean_phone_series(series)
+    return digits.astype(object).where(valid.eq("Yes"), None)
+
+
+def row_key(columns, values):
+    """
+    Key of a row without a valid mobile number: a hash of its columns and
+    values, so writing the same row again is a no-op instead of a
+    duplicate, while rows that differ are still all kept.
+    """
+    payload = json.dumps([columns, values], ensure_ascii=False)
+    return "row:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# -----------------------------
+# MASTER DATASET STORE
+# -----------------------------
+class MasterStore:
+    """
+    Persistent master dataset in SQLite with a UNIQUE index on the
+    normalized mobile number, so appending / upserting a batch costs one
+    index lookup per batch row instead of re-reading the whole master.
+    The table is created on the first write and columns are stored as
+    TEXT, added on first use. The row count is kept next to the last write
+    time, so len() is one lookup instead of a COUNT(*) scan. One connection
+    serves all threads, so every statement runs under a lock.
+    """
+
+    def __init__(self, path=MASTER_DB, table=MASTER_TABLE):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self.table = table
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+
+        with self.lock:
+            self.columns = self._columns()
+
+    def _exists(self):
+        sql = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+        return self.conn.execute(sql, (self.table,)).fetchone() is not None
+
+    def _create(self):
+        # also after expire_sessions dropped the table under this store
+        if self._exists():
+            return
+        self.conn.execute(f"CREATE TABLE {_quote(self.table)} ({_quote(KEY_COLUMN)} TEXT)")
+        self.conn.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {_quote(self.table + '_mobile')} "
+            f"ON {_quote(self.table)} ({_quote(KEY_COLUMN)})"
+        )
+        self.columns = []
+
+    def _touch(self, added):
+        # a new entry has no row count yet; _row_count fills it in once
+        _create_usage(self.conn)
+        self.conn.execute(
+            f"INSERT INTO {_quote(USAGE_TABLE)} (name, last_used) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET last_used = excluded.last_used, row_count = row_count + ?",
+            (self.table, time.time(), added),
+        )
+
+    def _row_count(self):
+        try:
+            row = self.conn.execute(
+                f"SELECT row_count FROM {_quote(USAGE_TABLE)} WHERE name = ?", (self.table,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            row = None  # no usage table yet
+
+        if row is not None and row[0] is not None:
+            return row[0]
+
+        # first count of this table (new, or written before counts were kept)
+        count = self.conn.execute(f"SELECT COUNT(*) FROM {_quote(self.table)}").fetchone()[0]
+        with self.conn:
+            _create_usage(self.conn)
+            self.conn.execute(
+                f"INSERT INTO {_quote(USAGE_TABLE)} (name, last_used, row_count) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET row_count = excluded.row_count",
+                (self.table, time.time(), count),
+            )
+        return count
+
+    def _stored(self, keys, batch_size=500):
+        # how many of keys are already in the table (index lookups)
+        keys = list(keys)
+        found = 0
+        for i in range(0, len(keys), batch_size):
+            part = keys[i:i + batch_size]
+            sql = (
+                f"SELECT COUNT(*) FROM {_quote(self.table)} "
+                f"WHERE {_quote(KEY_COLUMN)} IN ({', '.join('?' * len(part))})"
+            )
+            found += self.conn.execute(sql, part).fetchone()[0]
+        return found
+
+    def _columns(self):
+        rows = self.conn.execute(f"PRAGMA table_info({_quote(self.table)})").fetchall()
+        return [row[1] for row in rows if row[1] != KEY_COLUMN]
+
+    def _add_columns(self, columns):
+        """
+        Adds the columns not stored yet.
+        returns: columns in their stored spelling ("city" -> existing "City")
+        """
+        stored = {_fold(col): col for col in self.columns}
+        for col in columns:
+            if _fold(col) not in stored:
+                self.conn.execute(f"ALTER TABLE {_quote(self.table)} ADD COLUMN {_quote(col)} TEXT")
+                self.columns.append(col)
+                stored[_fold(col)] = col
+        return [stored[_fold(col)] for col in columns]
+
+    def write(self, df, key_column, mode="upsert"):
+        """
+        df: cleaned batch
+        key_column: mobile number column of df
+        mode: "upsert" - rows with a known mobile number replace the stored values
+              "append" - rows with a known mobile number are skipped
+        returns: number of rows inserted or updated
+        """
+        if mode not in ("upsert", "append"):
+            raise ValueError(f"Unknown mode: {mode}")
+
+        if key_column in df.columns:
+            keys = mobile_keys(df[key_column])
+        else:
+            keys = pd.Series(None, index=df.index, dtype=object)
+
+        values = df.astype(object).where(df.notna(), None)
+
+        with self.lock:
+            before = self.conn.total_changes
+            with self.conn:
+                self._create()
+                columns = self._add_columns([str(col) for col in df.columns])
+                rows = list(self._rows(values, keys, columns))
+
+                # only keys not stored yet add rows; the rest update or are skipped
+                new_keys = {row[-1] for row in rows}
+                added = len(new_keys) - self._stored(new_keys)
+
+                self.conn.executemany(self._insert_sql(columns, mode), rows)
+                changed = self.conn.total_changes - before
+                self._touch(added)
+
+        return changed
+
+    @staticmethod
+    def _rows(values, keys, columns):
+        for row, key in zip(values.itertuples(index=False, name=None), keys):
+            row = [None if v is None else str(v) for v in row]
+            yield tuple(row) + (key if key is not None else row_key(columns, row),)
+
+    def _insert_sql(self, columns, mode):
+        names = ", ".join(_quote(col) for col in columns + [KEY_COLUMN])
+        params = ", ".join("?" * (len(columns) + 1))
+
+        if mode == "upsert" and columns:
+            conflict = "DO UPDATE SET " + ", ".join(f"{_quote(col)} = excluded.{_quote(col)}" for col in columns)
+        else:
+            conflict = "DO NOTHING"
+
+        return (
+            f"INSERT INTO {_quote(self.table)} ({names}) VALUES ({params}) "
+            f"ON CONFLICT({_quote(KEY_COLUMN)}) {conflict}"
+        )
+
+    def upsert(self, df, key_column):
+        return self.write(df, key_column, mode="upsert")
+
+    def append(self, df, key_column):
+        return self.write(df, key_column, mode="append")
+
+    def __len__(self):
+        with self.lock:
+            if not self._exists():
+                return 0
+            return self._row_count()
+
+    def read(self, limit=None):
+        """
+        limit: only the first limit rows (a LIMIT query, for previews)
+        returns: the master dataset as a DataFrame, in insertion order
+        """
+        with self.lock:
+            if not self.columns or not self._exists():
+                return pd.DataFrame()
+
+            names = ", ".join(_quote(col) for col in self.columns)
+            sql = f"SELECT {names} FROM {_quote(self.table)} ORDER BY rowid"
+            if limit is not None:
+                sql += f" LIMIT {int(limit)}"
+            return pd.read_sql_query(sql, self.conn)
+
+    def head(self, n=10):
+        return self.read(limit=n)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def _create_usage(conn):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {_quote(USAGE_TABLE)} "
+        "(name TEXT PRIMARY KEY, last_used REAL, row_count INTEGER)"
+    )
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(USAGE_TABLE)})")]
+    if "row_count" not in columns:
+        conn.execute(f"ALTER TABLE {_quote(USAGE_TABLE)} ADD COLUMN row_count INTEGER")
+
+
+def expire_sessions(path=MASTER_DB, prefix=SESSION_PREFIX, max_age=SESSION_MAX_AGE):
+    """
+    Drops per-session master tables that are empty or were last written
+    more than max_age seconds ago. Named (shared) masters are kept.
+    returns: names of the dropped tables
+    """
+    if not Path(path).exists():
+        return []
+
+    now = time.time()
+    dropped = []
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            _create_usage(conn)
+            last_used = dict(conn.execute(f"SELECT name, last_used FROM {_quote(USAGE_TABLE)}"))
+            tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+
+            for table in tables:
+                if not table.startswith(prefix):
+                    continue
+
+                empty = conn.execute(f"SELECT EXISTS (SELECT 1 FROM {_quote(table)})").fetchone()[0] == 0
+                if table not in last_used and not empty:
+                    # written before usage was tracked: start its clock now
+                    conn.execute(f"INSERT INTO {_quote(USAGE_TABLE)} (name, last_used) VALUES (?, ?)", (table, now))
+                elif empty or now - last_used[table] > max_age:
+                    conn.execute(f"DROP TABLE {_quote(table)}")
+                    conn.execute(f"DELETE FROM {_quote(USAGE_TABLE)} WHERE name = ?", (table,))
+                    dropped.append(table)
+    finally:
+        conn.close()
+
+    return dropped
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+UPLOAD_ROOT = Path(tempfile.gettempdir()) / "data_cleaner_uploads"
+UPLOAD_MAX_AGE = 24 * 60 * 60          # seconds since an entry was last used
+UPLOAD_MAX_BYTES = 2 * 1024 ** 3       # total size kept on disk
+
+
+# -----------------------------
+# CONTENT-ADDRESSED UPLOAD STORE
+# -----------------------------
+class UploadStore:
+    """
+    Keeps each distinct uploaded file once on disk, under
+    root/<sha256>/<file name>, so reruns and repeated uploads of the same
+    file reuse the stored copy instead of writing a new temp directory.
+
+    Entries are evicted by age (last use) and by a total size limit.
+    """
+
+    def __init__(self, root=UPLOAD_ROOT, max_age=UPLOAD_MAX_AGE, max_bytes=UPLOAD_MAX_BYTES):
+        self.root = Path(root)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def put(self, name, data, digest=None):
+        """
+        name: original file name (kept, the cleaners report it per row)
+        data: bytes-like object, e.g. the memoryview of UploadedFile.getbuffer()
+        digest: sha256 hex digest of data when already known
+        returns: pathlib.Path of the stored file
+        """
+        if digest is None:
+            digest = hashlib.sha256(data).hexdigest()
+
+        entry = self.root / digest
+        path = entry / Path(name).name
+
+        if path.exists():
+            # mark as recently used so eviction keeps it
+            os.utime(entry)
+            return path
+
+        entry.mkdir(exist_ok=True)
+
+        # write to a temp name first: a concurrent session never reads a
+        # half-written file
+        fd, tmp = tempfile.mkstemp(dir=entry)
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp, path)
+        os.utime(entry)
+
+        return path
+
+    def put_uploads(self, uploaded_files, digests=None):
+        """
+        uploaded_files: Streamlit UploadedFile objects
+        digests: optional sha256 digests, same order as uploaded_files
+        returns: list of pathlib.Path, same order as uploaded_files
+        """
+        if digests is None:
+            digests = [None] * len(uploaded_files)
+
+        return [self.put(f.name, f.getbuffer(), digest) for f, digest in zip(uploaded_files, digests)]
+
+    def _entries(self):
+        entries = []
+        for entry in self.root.iterdir():
+            if not entry.is_dir():
+                continue
+            try:
+                size = sum(p.stat().st_size for p in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+            except FileNotFoundError:
+                # removed by another session meanwhile
+                continue
+        return entries
+
+    def disk_usage(self):
+        """returns: {"entries": ..., "bytes": ...} currently stored"""
+        entries = self._entries()
+        return {"entries": len(entries), "bytes": sum(size for _, size, _ in entries)}
+
+    def evict(self, keep=()):
+        """
+        Removes entries unused for longer than max_age, then the least
+        recently used ones until the store fits in max_bytes.
+        keep: digests that must stay, e.g. the current uploads
+        returns: number of entries removed
+        """
+        keep = set(keep)
+        now = time.time()
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for mtime, size, entry in entries:
+            if entry.name in keep:
+                continue
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                continue
+
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+
+        return removed